@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Sensor Acquisition Engine
+Runs each I2C device in its own worker thread with its own cadence
+
+A slow or stuck device (AHT20 conversion wait, GPS I2C reads) only delays
+its own worker. Workers publish timestamped values back to the station, so
+the render loop never waits on the bus.
+
+With a Supervisor attached, a worker only touches its device while the
+supervisor says it is available, and asks it to re-open the device otherwise.
+"""
+
+import threading
+import time
+
+
+class SensorWorker:
+    """Polls one device on its own thread at a fixed cadence."""
+
+    def __init__(self, name, read_func, publish, interval, retry_interval=None, metrics=None,
+                 supervisor=None):
+        """
+        read_func() returns a dict of sensor_data fields, or None when the
+        device has nothing new yet (e.g. SCD-41 data not ready). In that case
+        the worker polls again after retry_interval instead of interval.
+        """
+        self.name = name
+        self.read_func = read_func
+        self.publish = publish
+        self.interval = interval
+        self.retry_interval = retry_interval or interval
+        self.normal_interval = self.interval              # Restored after set_interval()
+        self.normal_retry_interval = self.retry_interval
+        self.metrics = metrics
+        self.supervisor = supervisor
+
+        self.reads = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_read = None  # monotonic time of last successful publish
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # Cuts the current sleep short
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"sensor-{self.name}", daemon=True)
+        self._thread.start()
+
+    def set_interval(self, interval, retry_interval=None):
+        """Change the cadence; the next read happens right away."""
+        self.interval = interval
+        self.retry_interval = retry_interval or interval
+        self._wake.set()
+
+    def stop(self, wait=True):
+        """Stop the worker; with wait, also wait briefly for it to exit."""
+        self._stop.set()
+        self._wake.set()
+        if wait:
+            self.join()
+
+    def join(self, timeout=1.0):
+        """Wait for the worker thread to exit."""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def read_once(self):
+        """One read (or re-open attempt); returns the delay until the next one."""
+        if self.supervisor and not self.supervisor.available(self.name):
+            wait = self.supervisor.attempt(self.name)
+            if wait:
+                return wait
+        start = time.perf_counter()
+        try:
+            values = self.read_func()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            if self.metrics:
+                self.metrics.inc('sensor_errors_total', sensor=self.name)
+            if self.supervisor:
+                self.supervisor.read_failed(self.name, e)
+            return self.interval
+        if self.metrics:
+            self.metrics.observe('sensor_read_ms', (time.perf_counter() - start) * 1000, sensor=self.name)
+        if self.supervisor:
+            self.supervisor.read_ok(self.name)
+        if values is None:
+            return self.retry_interval
+        self.publish(values)
+        self.reads += 1
+        self.last_read = time.monotonic()
+        return self.interval
+
+    def _loop(self):
+        """Read, publish, sleep - until stopped."""
+        while not self._stop.is_set():
+            delay = self.read_once()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+
+class AcquisitionEngine:
+    """Owns one SensorWorker per device."""
+
+    def __init__(self, publish, metrics=None, supervisor=None):
+        self.publish = publish
+        self.metrics = metrics
+        self.supervisor = supervisor
+        self.workers = {}
+
+    def add(self, name, read_func, interval, retry_interval=None):
+        """Register a device reader with its own cadence (seconds)."""
+        self.workers[name] = SensorWorker(name, read_func, self.publish, interval, retry_interval, self.metrics,
+                                          self.supervisor)
+
+    def start(self):
+        """Start all workers."""
+        for worker in self.workers.values():
+            worker.start()
+
+    def stop(self):
+        """Stop all workers (signal them all first, so they wind down together)."""
+        for worker in self.workers.values():
+            worker.stop(wait=False)
+        for worker in self.workers.values():
+            worker.join()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Streaming Alert Rules
+Threshold, rate-of-change and sustained conditions, evaluated per sample
+
+Rules are indexed by the field they watch, so each published reading only
+touches its own rules. Every rule keeps a constant amount of state (plus a
+sliding window for windowed rules), so evaluating a sample costs the same
+however long the station has been running:
+- Threshold:    value (or its mean over a sliding window) above / below a
+                limit; clears only after moving back by `hysteresis`
+- RateOfChange: change per `per` seconds between the oldest and newest
+                sample in a sliding window, rising or falling
+- sustain:      either kind only fires once its condition has held for
+                that many seconds without a break
+
+A rule fires once when it becomes active and once more when it clears.
+The engine returns those transitions as AlertEvents; the station runs the
+rule's actions for them on its main loop. Evaluating and reading the state
+(the web API) take the engine's lock, so they can happen on any thread.
+
+Webhooks: LocalWebhook keeps payloads in memory (a stand-in for testing),
+HTTPWebhook POSTs them as JSON from a short-lived thread.
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from collections import deque
+
+
+class SlidingWindow:
+    """Samples of the last `seconds`, with a running sum (O(1) amortized per add)."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()
+        self.total = 0.0
+
+    def add(self, now, value):
+        self.samples.append((now, value))
+        self.total += value
+        while now - self.samples[0][0] > self.seconds:
+            self.total -= self.samples.popleft()[1]
+
+    @property
+    def span(self):
+        """Seconds between the oldest and newest sample."""
+        return self.samples[-1][0] - self.samples[0][0]
+
+    @property
+    def ready(self):
+        """At least half the window is covered (too little data is not an average or a trend)."""
+        return self.span >= self.seconds / 2
+
+    @property
+    def mean(self):
+        return self.total / len(self.samples)
+
+
+class Rule:
+    """Base: active / cleared state machine with an optional sustain time."""
+
+    def __init__(self, name, field, sustain=0.0, actions=()):
+        self.name = name
+        self.field = field
+        self.sustain = sustain
+        self.actions = tuple(actions)
+        self.active = False
+        self.value = None    # Last measured value (reading, mean or rate)
+        self.since = None    # When the condition started holding
+        self.fired = 0
+
+    def update(self, now, value):
+        """Feed one reading. Returns True when the rule fires, False when it clears, else None."""
+        measured = self.measure(now, value)
+        if measured is None:
+            return None
+        self.value = measured
+        if self.active:
+            if self.cleared(measured):
+                self.active = False
+                self.since = None
+                return False
+            return None
+        if not self.triggered(measured):
+            self.since = None
+            return None
+        if self.since is None:
+            self.since = now
+        if now - self.since >= self.sustain:
+            self.active = True
+            self.fired += 1
+            return True
+        return None
+
+    def measure(self, now, value):
+        return value
+
+    def triggered(self, value):
+        raise NotImplementedError
+
+    def cleared(self, value):
+        raise NotImplementedError
+
+
+class Threshold(Rule):
+    """Reading (or its sliding-window mean) above `above` or below `below`."""
+
+    def __init__(self, name, field, above=None, below=None, hysteresis=0.0, window=None, sustain=0.0,
+                 actions=()):
+        super().__init__(name, field, sustain, actions)
+        self.above = above
+        self.below = below
+        self.hysteresis = hysteresis
+        self.window = SlidingWindow(window) if window else None
+
+    def measure(self, now, value):
+        if self.window is None:
+            return value
+        self.window.add(now, value)
+        return self.window.mean if self.window.ready else None
+
+    def triggered(self, value):
+        return ((self.above is not None and value > self.above) or
+                (self.below is not None and value < self.below))
+
+    def cleared(self, value):
+        return ((self.above is None or value <= self.above - self.hysteresis) and
+                (self.below is None or value >= self.below + self.hysteresis))
+
+
+class RateOfChange(Rule):
+    """Rising faster than `rise` or falling faster than `fall` per `per` seconds, over `window` seconds."""
+
+    def __init__(self, name, field, window, rise=None, fall=None, per=60.0, hysteresis=0.0, sustain=0.0,
+                 actions=()):
+        super().__init__(name, field, sustain, actions)
+        self.window = SlidingWindow(window)
+        self.rise = rise
+        self.fall = fall
+        self.per = per
+        self.hysteresis = hysteresis
+
+    def measure(self, now, value):
+        self.window.add(now, value)
+        if not self.window.ready:
+            return None
+        (first_time, first), (last_time, last) = self.window.samples[0], self.window.samples[-1]
+        return (last - first) / (last_time - first_time) * self.per
+
+    def triggered(self, rate):
+        return ((self.rise is not None and rate > self.rise) or
+                (self.fall is not None and rate < -self.fall))
+
+    def cleared(self, rate):
+        return ((self.rise is None or rate <= self.rise - self.hysteresis) and
+                (self.fall is None or rate >= -self.fall + self.hysteresis))
+
+
+class AlertEvent:
+    """A rule firing (active=True) or clearing."""
+
+    def __init__(self, rule, active, timestamp):
+        self.rule = rule.name
+        self.field = rule.field
+        self.active = active
+        self.value = rule.value
+        self.actions = rule.actions
+        self.timestamp = timestamp
+
+    def payload(self):
+        return {
+            'rule': self.rule,
+            'field': self.field,
+            'state': 'firing' if self.active else 'cleared',
+            'value': self.value,
+            'time': self.timestamp,
+        }
+
+
+class AlertEngine:
+    """Evaluates rules against each published sample."""
+
+    def __init__(self, rules, metrics=None, history=50):
+        self.rules = list(rules)
+        self.metrics = metrics
+        self.by_field = {}
+        for rule in self.rules:
+            self.by_field.setdefault(rule.field, []).append(rule)
+        self.recent = deque(maxlen=history)  # Latest AlertEvents
+        self.version = 0                     # Bumped on every transition
+        self.evaluations = 0
+        self._lock = threading.Lock()        # Guards rule state and recent
+
+    def evaluate(self, values, now, timestamp=None):
+        """Feed one sample (field -> value); returns the AlertEvents it caused."""
+        events = []
+        with self._lock:
+            for field, value in values.items():
+                rules = self.by_field.get(field)
+                if not rules or value is None or value != value:  # No rules, missing or NaN
+                    continue
+                for rule in rules:
+                    self.evaluations += 1
+                    state = rule.update(now, value)
+                    if state is None:
+                        continue
+                    event = AlertEvent(rule, state, time.time() if timestamp is None else timestamp)
+                    events.append(event)
+                    self.recent.append(event)
+                    self.version += 1
+        if self.metrics:
+            for event in events:
+                self.metrics.set('alert_active', int(event.active), rule=event.rule)
+                if event.active:
+                    self.metrics.inc('alerts_fired_total', rule=event.rule)
+        return events
+
+    def active(self, field=None):
+        """Names of active rules (watching field, if given)."""
+        rules = self.by_field.get(field, ()) if field else self.rules
+        with self._lock:
+            return [rule.name for rule in rules if rule.active]
+
+    def snapshot(self):
+        """Rule states and recent transitions, for the API (a consistent copy)."""
+        with self._lock:
+            return {
+                'rules': [{'rule': r.name, 'field': r.field, 'active': r.active, 'value': r.value, 'fired': r.fired}
+                          for r in self.rules],
+                'recent': [event.payload() for event in self.recent],
+            }
+
+
+class LocalWebhook:
+    """In-process webhook stand-in: keeps what would have been POSTed."""
+
+    def __init__(self, history=100):
+        self.sent = deque(maxlen=history)
+        self._lock = threading.Lock()  # send() runs on the main loop, payloads() on the web thread
+
+    def send(self, payload):
+        with self._lock:
+            self.sent.append(payload)
+
+    def payloads(self):
+        """Copy of the payloads kept."""
+        with self._lock:
+            return list(self.sent)
+
+
+class HTTPWebhook:
+    """POST each payload as JSON, off the calling thread."""
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self.sent = 0
+        self.failures = 0
+
+    def send(self, payload):
+        threading.Thread(target=self._post, args=(payload,), name="webhook", daemon=True).start()
+
+    def _post(self, payload):
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+            self.sent += 1
+        except OSError as e:
+            self.failures += 1
+            print(f"✗ Alert webhook failed: {e}")
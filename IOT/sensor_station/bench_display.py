@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Display Benchmark
+Times each page and the full update_display() path on the simulated ST7789
+
+For every page, without and with the network overlay:
+- draw_ms:            the page's draw method (plus the overlay) on its own
+- frame_ms / fps:     update_display() - draw, diff and push to the sink
+- alloc_kb_per_frame: Python heap allocated during one frame (tracemalloc)
+- push_alloc_kb:      of that, peak heap use during the push. About 1.2 KB
+                      is the station's own short-lived window views and SPI
+                      slices; the rest is the simulated panel decoding writes
+- push_blocks:        heap blocks each push leaves allocated (should be ~0)
+- rgb565_ms:          RGB565 conversion time per window pushed
+- retained_blocks:    heap blocks still alive after all frames (should be ~0)
+Peak RSS and the Python heap peak are reported for the whole run.
+
+Readings (and, under the overlay, the ping) change every frame so the
+dirty-region pusher has work to do, and every frame is rendered
+(update_display(force=True)).
+Results are saved as JSON; --compare prints the change against an older
+result file.
+
+    python3 bench_display.py --frames 300 --compare bench/display-old.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy
+import PIL
+
+from hardware import SimBackend
+from sensor_display import SensorStation
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench')
+
+# Readings shown during the benchmark; numeric ones are nudged every frame
+READINGS = {
+    'temperature_aht': 22.5, 'humidity_aht': 45.0, 'temperature_bmp': 23.1,
+    'pressure': 1003.2, 'altitude': 84.0, 'co2': 612, 'temperature_scd': 24.0,
+    'humidity_scd': 40.0, 'gps_fix': True, 'latitude': 32.7555, 'longitude': -97.3308,
+    'gps_altitude': 198.0, 'satellites': 9, 'temperature': 22.6, 'temperature_sigma': 0.2,
+    'humidity': 44.8, 'humidity_sigma': 1.4,
+}
+
+
+def make_station(directory):
+    """A station on simulated hardware, quietly, with its log in directory."""
+    log_path = os.path.join(directory, 'bench.db')
+    with contextlib.redirect_stdout(io.StringIO()):
+        station = SensorStation(SimBackend(latency=0, seed=0), log_path=log_path)
+    station.network_info.update(ssid='bench-net', ip='192.168.1.50', ping_ms='12.3 ms', signal_dbm=-52)
+    return station
+
+
+def close_station(station):
+    """Close the reading log, rollups and exporter (the station never ran)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for output in (station.logger, station.rollups, station.exporter):
+            if output:
+                output.close()
+
+
+def set_readings(station, frame):
+    """Deterministic readings for frame number frame."""
+    now = time.monotonic()
+    for key, value in READINGS.items():
+        if isinstance(value, bool):
+            station.sensor_data[key] = value
+        elif isinstance(value, int):
+            station.sensor_data[key] = value + frame % 37
+        else:
+            station.sensor_data[key] = value + (frame % 23) * 0.1
+        station.sensor_times[key] = now
+    station.sensor_data['datetime'] = time.localtime(1_700_000_000 + frame)
+    station.sensor_times['datetime'] = now
+    station.network_info['ping_ms'] = f"{12.3 + (frame % 19) * 0.1:.1f} ms"
+
+
+def bench_case(station, page, overlay, frames, warmup=10):
+    """Measure one page with or without the overlay."""
+    station.current_page = page
+    station.show_network = overlay
+    draw_page = station.pages[page]
+
+    def draw():
+        draw_page()
+        if overlay:
+            station.draw_network_overlay()
+
+    for i in range(warmup):
+        set_readings(station, i)
+        station.update_display(force=True)
+
+    # Draw only
+    draw_times = []
+    for i in range(frames):
+        set_readings(station, i)
+        start = time.perf_counter()
+        draw()
+        draw_times.append((time.perf_counter() - start) * 1000)
+
+    # Full frames
+    frame_times = []
+    writer = station.pusher.writer
+    conversions, convert_ms = writer.conversions, writer.convert_ms
+    pushed = station.hw.screen.bytes_written
+    start_all = time.perf_counter()
+    for i in range(frames):
+        set_readings(station, i)
+        start = time.perf_counter()
+        station.update_display(force=True)
+        frame_times.append((time.perf_counter() - start) * 1000)
+    elapsed = time.perf_counter() - start_all
+    pushed = station.hw.screen.bytes_written - pushed
+    conversions = writer.conversions - conversions
+    convert_ms = writer.convert_ms - convert_ms
+
+    # Allocations, in a separate pass (tracemalloc slows everything down)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    allocated = 0
+    push_allocated = 0
+    for i in range(frames):
+        set_readings(station, i)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        draw()
+        push_base, draw_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        station.pusher.push()
+        push_peak = tracemalloc.get_traced_memory()[1]
+        push_allocated += push_peak - push_base
+        allocated += max(draw_peak, push_peak) - base
+    after = tracemalloc.take_snapshot()
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+
+    # Blocks each push leaves allocated: push two pre-drawn frames in turn,
+    # so nothing else runs in between to reuse or free what a push left
+    # (freelists would otherwise move blocks from one phase to the other)
+    pusher = station.pusher
+    drawn = []
+    for i in (0, 1):
+        set_readings(station, i)
+        draw()
+        drawn.append(pusher.pixels.copy())
+    pusher.push()
+    own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = tracemalloc.take_snapshot().filter_traces(own)
+    for i in range(frames):
+        numpy.copyto(pusher.pixels, drawn[i % 2])
+        pusher.push()
+    after = tracemalloc.take_snapshot().filter_traces(own)
+    push_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    tracemalloc.stop()
+
+    draw_times.sort()
+    frame_times.sort()
+    return {
+        'page': draw_page.__name__[10:],
+        'overlay': overlay,
+        'frames': frames,
+        'draw_ms': round(sum(draw_times) / frames, 4),
+        'draw_p95_ms': round(draw_times[int(frames * 0.95)], 4),
+        'frame_ms': round(sum(frame_times) / frames, 4),
+        'frame_p95_ms': round(frame_times[int(frames * 0.95)], 4),
+        'fps': round(frames / elapsed, 1),
+        'spi_bytes_per_frame': pushed // frames,
+        'rgb565_ms': round(convert_ms / conversions, 4) if conversions else 0.0,
+        'alloc_kb_per_frame': round(allocated / frames / 1024, 2),
+        'push_alloc_kb': round(push_allocated / frames / 1024, 2),
+        'push_blocks': round(push_blocks / frames, 2),
+        'retained_blocks': retained,
+        'heap_peak_kb': round(heap_peak / 1024, 1),
+    }
+
+
+def run(frames):
+    with tempfile.TemporaryDirectory() as directory:
+        station = make_station(directory)
+        try:
+            cases = []
+            for overlay in (False, True):
+                for page in range(station.num_pages):
+                    cases.append(bench_case(station, page, overlay, frames))
+        finally:
+            close_station(station)
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'machine': platform.machine(),
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'cases': cases,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def report(results, baseline=None):
+    """Print a table, with % change in frame_ms against baseline if given."""
+    old = {}
+    if baseline:
+        old = {(c['page'], c['overlay']): c for c in baseline['cases']}
+    print(f"{'page':<20}{'draw ms':>9}{'frame ms':>10}{'p95':>8}{'fps':>8}{'alloc KB':>10}{'push KB':>9}"
+          f"{'blocks':>8}{'565 ms':>8}{'SPI KB':>8}")
+    for case in results['cases']:
+        name = case['page'] + (' +net' if case['overlay'] else '')
+        line = (f"{name:<20}{case['draw_ms']:>9.3f}{case['frame_ms']:>10.3f}{case['frame_p95_ms']:>8.3f}"
+                f"{case['fps']:>8.0f}{case['alloc_kb_per_frame']:>10.1f}{case.get('push_alloc_kb', 0):>9.2f}"
+                f"{case.get('push_blocks', 0):>8.2f}{case.get('rgb565_ms', 0):>8.3f}{case['spi_bytes_per_frame'] / 1024:>8.1f}")
+        previous = old.get((case['page'], case['overlay']))
+        if previous and previous['frame_ms']:
+            line += f"  {(case['frame_ms'] / previous['frame_ms'] - 1) * 100:+.0f}%"
+        print(line)
+    print(f"Peak RSS: {results['peak_rss_kb'] / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the display pipeline")
+    parser.add_argument('--frames', type=int, default=200, help="frames per case")
+    parser.add_argument('--output', help="result file (default bench/display-<time>.json)")
+    parser.add_argument('--compare', metavar='JSON', help="earlier result file to compare with")
+    args = parser.parse_args()
+
+    results = run(args.frames)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    path = args.output
+    if not path:
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        path = os.path.join(BENCH_DIR, f"display-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Results saved to {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Burst Readers
+One measurement per device per cycle for the BMP280 and AHT20
+
+The Adafruit drivers measure again on every property access. Reading
+temperature, pressure and altitude from the BMP280 that way runs five
+conversions and register reads (pressure and altitude each re-read the
+temperature for compensation), and the AHT20 runs its ~80ms measurement
+once for temperature and again for humidity.
+
+These readers trigger one measurement, fetch it in one transaction and
+derive every field from it:
+- BMP280: one forced conversion (unless the sensor is in normal mode), one
+  6-byte read of the pressure and temperature registers, compensation with
+  the driver's calibration coefficients, altitude from the same pressure
+- AHT20: one _readdata(), both fields from its result
+
+They use driver internals (_read_register, _temp_calib, _pressure_calib,
+_readdata), the same way gps_reader.py reads the GPS buffer directly.
+"""
+
+import math
+import time
+
+# BMP280 registers and modes (as in adafruit_bmp280)
+BMP280_DATA = 0xF7       # press_msb .. temp_xlsb, 6 bytes
+BMP280_MODE_FORCE = 0x01
+BMP280_MODE_NORMAL = 0x03
+BMP280_MEASURING = 0x08  # Status register bit
+
+
+def compensate_temperature(calib, raw):
+    """BMP280 datasheet float compensation: (deg C, t_fine) from the 20-bit ADC value."""
+    var1 = (raw / 16384.0 - calib[0] / 1024.0) * calib[1]
+    var2 = (raw / 131072.0 - calib[0] / 8192.0) ** 2 * calib[2]
+    t_fine = int(var1 + var2)
+    return t_fine / 5120.0, t_fine
+
+
+def compensate_pressure(calib, t_fine, raw):
+    """BMP280 datasheet float compensation: hPa from the 20-bit ADC value."""
+    var1 = t_fine / 2.0 - 64000.0
+    var2 = var1 * var1 * calib[5] / 32768.0
+    var2 = var2 + var1 * calib[4] * 2.0
+    var2 = var2 / 4.0 + calib[3] * 65536.0
+    var3 = calib[2] * var1 * var1 / 524288.0
+    var1 = (var3 + calib[1] * var1) / 524288.0
+    var1 = (1.0 + var1 / 32768.0) * calib[0]
+    if not var1:
+        raise ArithmeticError("Invalid BMP280 calibration (pressure var1 is 0)")
+    pressure = 1048576.0 - raw
+    pressure = ((pressure - var2 / 4096.0) * 6250.0) / var1
+    var1 = calib[8] * pressure * pressure / 2147483648.0
+    var2 = pressure * calib[7] / 32768.0
+    pressure = pressure + (var1 + var2 + calib[6]) / 16.0
+    return pressure / 100
+
+
+def altitude(pressure, sea_level_pressure):
+    """Barometric altitude (m), same formula as the driver."""
+    return 44330 * (1.0 - math.pow(pressure / sea_level_pressure, 0.1903))
+
+
+def read_bmp280(bmp):
+    """Temperature, pressure and altitude from one BMP280 measurement."""
+    if bmp.mode != BMP280_MODE_NORMAL:
+        # Sleep mode (the driver default): run one forced conversion
+        bmp.mode = BMP280_MODE_FORCE
+        while bmp._get_status() & BMP280_MEASURING:
+            time.sleep(0.002)
+    data = bmp._read_register(BMP280_DATA, 6)
+    # 20-bit values, left aligned in 24 bits
+    raw_pressure = ((data[0] << 16) | (data[1] << 8) | data[2]) / 16
+    raw_temperature = ((data[3] << 16) | (data[4] << 8) | data[5]) / 16
+    temperature, t_fine = compensate_temperature(bmp._temp_calib, raw_temperature)
+    pressure = compensate_pressure(bmp._pressure_calib, t_fine, raw_pressure)
+    return {
+        'temperature_bmp': temperature,
+        'pressure': pressure,
+        'altitude': altitude(pressure, bmp.sea_level_pressure),
+    }
+
+
+def read_aht20(aht):
+    """Temperature and humidity from one AHT20 measurement."""
+    aht._readdata()
+    return {
+        'temperature_aht': aht._temp,
+        'humidity_aht': aht._humidity,
+    }
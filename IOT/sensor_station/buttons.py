@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Mini PiTFT Button Events
+Edge-driven input layer that turns button presses into queued events
+
+Uses libgpiod edge detection so presses are caught by the kernel even while
+the main loop sleeps. Both Python bindings are supported: v2 (gpiod 2.x, from
+pip) and v1 (Debian's python3-libgpiod 1.6, as on Raspberry Pi OS Bookworm).
+
+If the lines can't be requested either way, pins are sampled on the input
+thread instead: every 10ms while a button is in use, every 50ms when idle
+and every 100ms in low-power mode.
+
+Events put on the queue (all debounced):
+- press:   button went down
+- long:    button held for long_press seconds
+- release: button came up (duration tells short taps from long holds)
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+ButtonEvent = namedtuple('ButtonEvent', ['button', 'kind', 'time', 'duration'])
+
+PRESS = 'press'
+LONG_PRESS = 'long'
+RELEASE = 'release'
+
+
+class ButtonInput:
+    """Feeds debounced press / long-press / release events into a queue."""
+
+    def __init__(self, events, debounce=0.03, long_press=1.0):
+        self.events = events
+        self.debounce = debounce
+        self.long_press = long_press
+
+        self._request = None   # gpiod v2 line request
+        self._lines = None     # gpiod v1 line bulk
+        self._chip = None      # gpiod v1 chip
+        self._offsets = {}     # gpiod line offset -> button name
+        self._pins = {}        # button name -> DigitalInOut-like (polling)
+        self._poll_interval = 0.01
+        self._idle_interval = 0.05
+        self._low_power_interval = 0.1
+        self._idle_after = 2.0  # Seconds without an edge before polling slows down
+        self.low_power = False
+
+        self._pressed = {}     # button name -> press time, while held
+        self._long_sent = set()
+        self._last_edge = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def open_gpiod(self, lines, chip='/dev/gpiochip0', consumer='sensor-station'):
+        """Request lines {name: offset} with edge detection. False if unavailable."""
+        try:
+            import gpiod
+            if hasattr(gpiod, 'request_lines'):
+                self._open_gpiod_v2(gpiod, lines, chip, consumer)
+            else:
+                self._open_gpiod_v1(gpiod, lines, chip, consumer)
+        except Exception as e:
+            print(f"✗ Button edge detection unavailable ({e}), polling the pins instead")
+            return False
+        self._offsets = {offset: name for name, offset in lines.items()}
+        return True
+
+    def _open_gpiod_v2(self, gpiod, lines, chip, consumer):
+        from datetime import timedelta
+        from gpiod.line import Bias, Direction, Edge
+
+        settings = gpiod.LineSettings(
+            direction=Direction.INPUT,
+            edge_detection=Edge.BOTH,
+            bias=Bias.PULL_UP,
+            debounce_period=timedelta(seconds=self.debounce),
+        )
+        self._request = gpiod.request_lines(
+            chip, consumer=consumer, config={tuple(lines.values()): settings})
+
+    def _open_gpiod_v1(self, gpiod, lines, chip, consumer):
+        # No kernel debounce in v1; _edge() debounces in software
+        self._chip = gpiod.Chip(chip)
+        try:
+            self._lines = self._chip.get_lines(list(lines.values()))
+            self._lines.request(consumer=consumer, type=gpiod.LINE_REQ_EV_BOTH_EDGES,
+                                flags=gpiod.LINE_REQ_FLAG_BIAS_PULL_UP)
+        except Exception:
+            self._chip.close()
+            self._chip = self._lines = None
+            raise
+
+    def use_pins(self, pins, interval=0.01, idle_interval=0.05, low_power_interval=0.1):
+        """
+        Sample {name: pin} (active low .value) on the input thread instead,
+        every interval while a button is in use and less often otherwise.
+        """
+        self._pins = pins
+        self._poll_interval = interval
+        self._idle_interval = idle_interval
+        self._low_power_interval = low_power_interval
+
+    def set_low_power(self, enabled):
+        """Poll (if polling) at the slowest rate while the station is in low-power mode."""
+        self.low_power = enabled
+
+    def start(self):
+        """Start the input thread."""
+        if self._request:
+            target = self._gpiod_loop
+        elif self._lines:
+            target = self._gpiod_v1_loop
+        else:
+            target = self._poll_loop
+        self._thread = threading.Thread(target=target, name="buttons", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the input thread and release the lines."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(0.5)
+        if self._request:
+            self._request.release()
+            self._request = None
+        if self._lines:
+            self._lines.release()
+            self._chip.close()
+            self._lines = self._chip = None
+
+    def _gpiod_loop(self):
+        """Block on kernel edge events, waking early only for long presses."""
+        from datetime import timedelta
+        from gpiod import EdgeEvent
+
+        while not self._stop.is_set():
+            timeout = self._time_to_long_press()
+            if self._request.wait_edge_events(timedelta(seconds=timeout)):
+                for event in self._request.read_edge_events():
+                    name = self._offsets[event.line_offset]
+                    pressed = event.event_type == EdgeEvent.Type.FALLING_EDGE
+                    self._edge(name, pressed, time.monotonic())
+            self._check_long_press(time.monotonic())
+
+    def _gpiod_v1_loop(self):
+        """Same as _gpiod_loop, with the libgpiod 1.x bindings."""
+        import gpiod
+
+        while not self._stop.is_set():
+            timeout = self._time_to_long_press()
+            ready = self._lines.event_wait(sec=int(timeout), nsec=int(timeout % 1 * 1e9))
+            if ready:
+                for line in ready:
+                    event = line.event_read()
+                    name = self._offsets[line.offset()]
+                    pressed = event.type == gpiod.LineEvent.FALLING_EDGE
+                    self._edge(name, pressed, time.monotonic())
+            self._check_long_press(time.monotonic())
+
+    def _poll_loop(self):
+        """Fallback: sample pins and synthesize edges."""
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for name, pin in self._pins.items():
+                self._edge(name, not pin.value, now)
+            self._check_long_press(now)
+            self._stop.wait(self._poll_delay(now))
+
+    def _poll_delay(self, now):
+        """Fast while a button is held or was just used, slower when idle or in low power."""
+        if self._pressed or now - max(self._last_edge.values(), default=-self._idle_after) < self._idle_after:
+            return self._poll_interval
+        return self._low_power_interval if self.low_power else self._idle_interval
+
+    def _edge(self, name, pressed, now):
+        """Debounce a state change and emit press/release events."""
+        if pressed == (name in self._pressed):
+            return
+        if now - self._last_edge.get(name, 0) < self.debounce:
+            return
+        self._last_edge[name] = now
+
+        if pressed:
+            self._pressed[name] = now
+            self._emit(name, PRESS, now, 0.0)
+        else:
+            start = self._pressed.pop(name)
+            self._long_sent.discard(name)
+            self._emit(name, RELEASE, now, now - start)
+
+    def _check_long_press(self, now):
+        """Emit a long-press once for each button held past the threshold."""
+        for name, start in list(self._pressed.items()):
+            if name not in self._long_sent and now - start >= self.long_press:
+                self._long_sent.add(name)
+                self._emit(name, LONG_PRESS, now, now - start)
+
+    def _time_to_long_press(self, idle=1.0):
+        """Seconds until the next pending long-press deadline."""
+        now = time.monotonic()
+        timeout = idle
+        for name, start in self._pressed.items():
+            if name not in self._long_sent:
+                timeout = min(timeout, max(0.0, start + self.long_press - now))
+        return timeout
+
+    def _emit(self, name, kind, now, duration):
+        self.events.put(ButtonEvent(name, kind, now, duration))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Persistent Reading Log
+SQLite (WAL mode) logger with write coalescing for SD cards
+
+Rows are buffered in memory and written by a background thread as one
+transaction per flush interval, so the SD card sees a few large writes
+instead of many small ones. A crash loses at most the rows buffered since
+the last flush; committed batches are recovered by SQLite's WAL.
+
+fsync policy:
+- 'batch':      fsync the WAL on every batch commit (synchronous=FULL)
+- 'checkpoint': fsync only at WAL checkpoints (synchronous=NORMAL); a
+                power cut may also lose the last few committed batches
+- 'off':        never fsync (synchronous=OFF)
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+
+SYNC_MODES = {'batch': 'FULL', 'checkpoint': 'NORMAL', 'off': 'OFF'}
+
+
+class ReadingLogger:
+    """Buffered, batched writer of reading rows to SQLite."""
+
+    def __init__(self, path, fields, flush_interval=60.0, fsync='batch', max_pending=10000):
+        if fsync not in SYNC_MODES:
+            raise ValueError(f"fsync must be one of {', '.join(SYNC_MODES)}")
+        self.path = path
+        self.fields = list(fields)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._pending = deque(maxlen=max_pending)  # Oldest rows dropped if writes stall
+        self._lock = threading.Lock()     # Guards _pending
+        self._db_lock = threading.Lock()  # Serializes use of the connection
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Statistics
+        self.rows_written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.last_flush_ms = 0.0
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"PRAGMA synchronous={SYNC_MODES[fsync]}")
+        columns = ", ".join(f"{name} REAL" for name in self.fields)
+        self.db.execute(f"CREATE TABLE IF NOT EXISTS readings (ts REAL NOT NULL, {columns})")
+        self.db.execute("CREATE INDEX IF NOT EXISTS readings_ts ON readings (ts)")
+        # Add columns for fields introduced since the database was created
+        existing = {row[1] for row in self.db.execute("PRAGMA table_info(readings)")}
+        for name in self.fields:
+            if name not in existing:
+                self.db.execute(f"ALTER TABLE readings ADD COLUMN {name} REAL")
+        self.db.commit()
+
+        placeholders = ", ".join("?" * (len(self.fields) + 1))
+        self._insert = f"INSERT INTO readings (ts, {', '.join(self.fields)}) VALUES ({placeholders})"
+
+    @property
+    def pending(self):
+        """Rows buffered but not yet written."""
+        return len(self._pending)
+
+    def record(self, timestamp, values):
+        """Buffer one row (cheap; never touches the disk)."""
+        row = (timestamp,) + tuple(values.get(name) for name in self.fields)
+        with self._lock:
+            self._pending.append(row)
+
+    def start(self):
+        """Start the background flush thread."""
+        self._thread = threading.Thread(target=self._loop, name="datalog", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Flush what is buffered, checkpoint the WAL and close."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5.0)
+        self.flush()
+        with self._db_lock:
+            try:
+                self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self.db.close()
+
+    def _loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in a single transaction."""
+        with self._lock:
+            rows = list(self._pending)
+            self._pending.clear()
+        if not rows:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            with self._db_lock, self.db:
+                self.db.executemany(self._insert, rows)
+        except sqlite3.Error as e:
+            self.write_errors += 1
+            print(f"✗ Reading log write failed: {e}")
+            # Put the batch back for the next attempt; if the buffer is
+            # full, the oldest rows are the ones dropped
+            with self._lock:
+                rows.extend(self._pending)
+                self._pending.clear()
+                self._pending.extend(rows)
+            return 0
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.rows_written += len(rows)
+        self.batches += 1
+        return len(rows)
+
+    def rows_since(self, since):
+        """Logged rows with ts >= since, oldest first, as dicts."""
+        query = f"SELECT ts, {', '.join(self.fields)} FROM readings WHERE ts >= ? ORDER BY ts"
+        with self._db_lock:
+            rows = self.db.execute(query, (since,)).fetchall()
+        return [(row[0], dict(zip(self.fields, row[1:]))) for row in rows]
+
+    def stats(self):
+        """Logger statistics."""
+        return {
+            'pending': self.pending,
+            'rows_written': self.rows_written,
+            'batches': self.batches,
+            'write_errors': self.write_errors,
+            'last_flush_ms': self.last_flush_ms,
+        }
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+MQTT Exporter
+Batched publishing of readings with a disk-backed offline queue
+
+submit() only appends to an in-memory buffer, so the display loop never
+waits on the network. A background thread publishes the buffer as one JSON
+message per batch. When the broker can't be reached (Wi-Fi down), batches
+are spilled to an SQLite outbox and drained in bulk once publishing works
+again - oldest first, back to back for as long as the token bucket allows,
+so a long outage drains at the rate limit without flooding the broker on
+reconnect. New rows wait in memory until the backlog is gone.
+
+Transports:
+- PahoTransport: a real MQTT broker via paho-mqtt (optional dependency)
+- LocalBroker:   in-process stand-in for testing without a broker
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+# Outcome of publishing one batch
+SENT = 'sent'
+THROTTLED = 'throttled'
+FAILED = 'failed'
+
+
+class LocalBroker:
+    """In-process broker stand-in; set online=False to simulate an outage."""
+
+    def __init__(self, keep=100):
+        self.online = True
+        self.messages = deque(maxlen=keep)  # Recent (topic, payload)
+        self.subscribers = []               # (topic, callback)
+
+    def connect(self):
+        pass
+
+    def subscribe(self, topic, callback):
+        """Call callback(topic, payload) for every message on topic."""
+        self.subscribers.append((topic, callback))
+
+    def publish(self, topic, payload):
+        """Deliver a message; False if 'offline'."""
+        if not self.online:
+            return False
+        self.messages.append((topic, payload))
+        for wanted, callback in self.subscribers:
+            if wanted == topic:
+                callback(topic, payload)
+        return True
+
+    def close(self):
+        pass
+
+
+class PahoTransport:
+    """QoS 1 publishing to an MQTT broker through paho-mqtt."""
+
+    def __init__(self, host, port=1883, client_id='sensor-station', timeout=5.0):
+        if mqtt is None:
+            raise RuntimeError("paho-mqtt is not installed")
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        try:
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+        except AttributeError:  # paho-mqtt < 2.0
+            self.client = mqtt.Client(client_id=client_id)
+
+    def connect(self):
+        """Connect in the background; paho reconnects by itself after that."""
+        self.client.connect_async(self.host, self.port)
+        self.client.loop_start()
+
+    def publish(self, topic, payload):
+        """
+        Publish and wait for the broker's ack; False if not delivered.
+        A batch whose ack times out is resent later (at-least-once).
+        """
+        if not self.client.is_connected():
+            return False
+        info = self.client.publish(topic, payload, qos=1)
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            return False
+        try:
+            info.wait_for_publish(self.timeout)
+        except (RuntimeError, ValueError):
+            return False
+        return info.is_published()
+
+    def close(self):
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+class Outbox:
+    """Disk-backed FIFO of encoded batches (SQLite, survives restarts)."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY, payload BLOB NOT NULL, rows INTEGER)")
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(outbox)")]
+        if 'rows' not in columns:  # Outbox from before row counts were stored
+            self.db.execute("ALTER TABLE outbox ADD COLUMN rows INTEGER")
+        self.db.commit()
+        self.depth = self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def put(self, batches):
+        """Append (payload, rows) batches in one transaction."""
+        with self.db:
+            self.db.executemany("INSERT INTO outbox (payload, rows) VALUES (?, ?)", batches)
+        self.depth += len(batches)
+
+    def peek(self, limit):
+        """Oldest (id, payload, rows) batches."""
+        queued = self.db.execute("SELECT id, payload, rows FROM outbox ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(row_id, payload, len(json.loads(payload)) if rows is None else rows)
+                for row_id, payload, rows in queued]
+
+    def remove_through(self, last_id):
+        """Drop every batch up to and including last_id."""
+        with self.db:
+            removed = self.db.execute("DELETE FROM outbox WHERE id <= ?", (last_id,)).rowcount
+        self.depth -= removed
+
+    def close(self):
+        self.db.close()
+
+
+class TokenBucket:
+    """Allows rate messages per second with bursts of up to burst."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Use one token if available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self):
+        """Seconds until a token is available."""
+        tokens = self.tokens + (time.monotonic() - self.updated) * self.rate
+        return max(0.0, (1 - tokens) / self.rate)
+
+
+class MQTTExporter:
+    """Buffers rows and publishes them in batches from a background thread."""
+
+    def __init__(self, transport, outbox_path, fields, topic='sensor_station/readings',
+                 batch_size=12, batch_interval=60.0, max_rate=2.0, burst=20, metrics=None):
+        self.transport = transport
+        self.fields = list(fields)
+        self.topic = topic
+        self.batch_size = batch_size          # Rows per message
+        self.batch_interval = batch_interval  # Longest a row waits in memory
+        self.metrics = metrics
+
+        self.outbox = Outbox(outbox_path)
+        self.limiter = TokenBucket(max_rate, burst)
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Statistics
+        self.messages = 0
+        self.rows_sent = 0
+        self.failures = 0
+        self.rate_limited = 0
+
+    def submit(self, timestamp, values):
+        """Queue one row for export (never blocks on the network or disk)."""
+        row = {name: values[name] for name in self.fields if values.get(name) is not None}
+        row['ts'] = timestamp
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def start(self):
+        """Connect and start the export thread."""
+        self.transport.connect()
+        self._thread = threading.Thread(target=self._loop, name="exporter", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop, and keep anything unsent in the outbox for next time."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(5.0)
+        self._spill(self._take_batches())
+        self.transport.close()
+        self.outbox.close()
+
+    def _loop(self):
+        delay = self.batch_interval
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if not self._stop.is_set():
+                delay = self.export()
+
+    def _take_batches(self):
+        """Encode everything pending into (payload, rows) batches."""
+        with self._lock:
+            rows = list(self._pending)
+            self._pending.clear()
+        batches = []
+        for i in range(0, len(rows), self.batch_size):
+            chunk = rows[i:i + self.batch_size]
+            batches.append((json.dumps(chunk, separators=(',', ':')).encode(), len(chunk)))
+        return batches
+
+    def _spill(self, batches):
+        if batches:
+            try:
+                self.outbox.put(batches)
+            except sqlite3.Error as e:
+                print(f"✗ Export outbox write failed: {e}")
+
+    def _send(self, payload, rows):
+        """Publish one batch within the rate limit: SENT, THROTTLED or FAILED."""
+        if not self.limiter.take():
+            self.rate_limited += 1
+            if self.metrics:
+                self.metrics.inc('export_rate_limited_total')
+            return THROTTLED
+        try:
+            sent = self.transport.publish(self.topic, payload)
+        except Exception:
+            sent = False
+        if not sent:
+            self.failures += 1
+            if self.metrics:
+                self.metrics.inc('export_failures_total')
+            return FAILED
+        self.messages += 1
+        self.rows_sent += rows
+        if self.metrics:
+            self.metrics.inc('export_messages_total')
+            self.metrics.inc('export_rows_total', rows)
+        return SENT
+
+    def export(self):
+        """
+        Drain the outbox, then publish new batches. Returns seconds until the
+        next call: right after the rate limit allows while a backlog is
+        draining, otherwise batch_interval.
+        """
+        result = SENT
+
+        # Backlog first, so the broker sees rows in order
+        while self.outbox.depth and result == SENT:
+            last_sent = None
+            for row_id, payload, rows in self.outbox.peek(50):
+                result = self._send(payload, rows)
+                if result != SENT:
+                    break
+                last_sent = row_id
+            if last_sent is not None:
+                self.outbox.remove_through(last_sent)
+
+        if result == THROTTLED:
+            # New rows stay in memory until the backlog is gone
+            self._update_metrics()
+            return max(self.limiter.wait_time(), 0.01)
+
+        batches = self._take_batches()
+        unsent = []
+        for i, (payload, rows) in enumerate(batches):
+            if result == SENT:
+                result = self._send(payload, rows)
+            if result != SENT:
+                unsent = batches[i:]
+                break
+        self._spill(unsent)
+        self._update_metrics()
+        if result == THROTTLED:
+            return max(self.limiter.wait_time(), 0.01)
+        return self.batch_interval
+
+    def _update_metrics(self):
+        """Queue depth gauges."""
+        if not self.metrics:
+            return
+        self.metrics.set('export_queue_depth', len(self._pending), queue='memory')
+        self.metrics.set('export_queue_depth', self.outbox.depth, queue='disk')
+
+    def stats(self):
+        """Exporter statistics."""
+        return {
+            'pending': len(self._pending),
+            'outbox': self.outbox.depth,
+            'messages': self.messages,
+            'rows_sent': self.rows_sent,
+            'failures': self.failures,
+            'rate_limited': self.rate_limited,
+        }
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Dirty-Region Frame Push for the ST7789
+Sends only the parts of a frame that changed since the last push
+
+Each new frame is diffed against the last frame sent to the panel. Changed
+areas are found per horizontal band and pushed as small windowed writes.
+Identical frames are skipped.
+
+No frame-sized buffer is allocated per frame: the station draws into a PIL
+image that shares memory with a NumPy array, the diff runs in preallocated
+arrays, and RGB565Writer converts each window into one reused bytearray and
+sends it with the panel's own window commands, in memoryview chunks. (The
+driver's image() would crop, rotate, convert to a NumPy array and then to a
+Python list of ints on every call.) What push() still allocates is small
+and short-lived: NumPy views of each window, the packed CASET/RASET
+parameters and the memoryview chunks, about 1.2 KB at peak. None of it
+outlives the push; bench_display.py reports both.
+"""
+
+import sys
+import time
+
+import numpy
+from PIL import Image
+
+
+class RGB565Writer:
+    """Windowed RGB565 writes from an RGBX pixel array to an adafruit_rgb_display panel."""
+
+    CHUNK_SIZE = 4096  # spidev's default transfer limit
+
+    def __init__(self, display, width, height, chunk_size=CHUNK_SIZE):
+        self.display = display
+        self.chunk_size = chunk_size
+        self.buffer = bytearray(width * height * 2)
+        self._view = memoryview(self.buffer)
+        self._words = numpy.frombuffer(self.buffer, dtype=numpy.uint16)
+        self._scratch = numpy.empty(width * height, numpy.uint16)
+
+        # Statistics
+        self.conversions = 0
+        self.convert_ms = 0.0   # Total time in to_rgb565()
+        self.chunks = 0
+
+    def to_rgb565(self, pixels):
+        """Convert an (h, w, 3+) uint8 array into the front of self.buffer; returns its length."""
+        start = time.perf_counter()
+        rows, cols = pixels.shape[:2]
+        count = rows * cols
+        out = self._words[:count].reshape(rows, cols)
+        tmp = self._scratch[:count].reshape(rows, cols)
+        # rrrrrggg gggbbbbb, all in place: widen with copyto, then native
+        # uint16 ops (mixed-type ufuncs would allocate cast buffers)
+        numpy.copyto(out, pixels[..., 0])
+        numpy.bitwise_and(out, 0xF8, out=out)
+        numpy.left_shift(out, 8, out=out)
+        numpy.copyto(tmp, pixels[..., 1])
+        numpy.bitwise_and(tmp, 0xFC, out=tmp)
+        numpy.left_shift(tmp, 3, out=tmp)
+        numpy.bitwise_or(out, tmp, out=out)
+        numpy.copyto(tmp, pixels[..., 2])
+        numpy.right_shift(tmp, 3, out=tmp)
+        numpy.bitwise_or(out, tmp, out=out)
+        if sys.byteorder == 'little':
+            out.byteswap(inplace=True)  # Big-endian on the wire
+        self.conversions += 1
+        self.convert_ms += (time.perf_counter() - start) * 1000
+        return count * 2
+
+    def write(self, pixels, x, y, rotation=0):
+        """Send pixels (frame orientation) to the panel window at x, y (panel coordinates)."""
+        # A view, as image() would rotate. numpy.rot90() gives the same views
+        # but builds several throwaway tuples and arrays on the way.
+        if rotation == 90:
+            pixels = pixels[:, ::-1].swapaxes(0, 1)
+        elif rotation == 180:
+            pixels = pixels[::-1, ::-1]
+        elif rotation == 270:
+            pixels = pixels[::-1].swapaxes(0, 1)
+        rows, cols = pixels.shape[:2]
+        size = self.to_rgb565(pixels)
+
+        # What the driver's _block() does, with the pixel data streamed in chunks
+        display = self.display
+        display.write(display._COLUMN_SET, display._encode_pos(x + display._X_START, x + cols - 1 + display._X_START))
+        display.write(display._PAGE_SET, display._encode_pos(y + display._Y_START, y + rows - 1 + display._Y_START))
+        display.write(display._RAM_WRITE)
+        display.dc_pin.value = 1
+        with display.spi_device as spi:
+            for start in range(0, size, self.chunk_size):
+                spi.write(self._view[start:min(start + self.chunk_size, size)])
+                self.chunks += 1
+
+
+class DirtyRegionPusher:
+    """Push changed rectangles of a PIL frame to an adafruit_rgb_display panel."""
+
+    BYTES_PER_PIXEL = 2       # RGB565 on the wire
+    WINDOW_OVERHEAD = 16      # Approx. bytes of CASET/RASET/RAMWR per window
+
+    def __init__(self, display, width, height, band_height=27):
+        """Draw into self.frame (RGBX, backed by self.pixels), then call push()."""
+        self.display = display
+        self.band_height = band_height
+        self.pixels = numpy.zeros((height, width, 4), numpy.uint8)
+        self.frame = Image.frombuffer("RGBX", (width, height), self.pixels, "raw", "RGBX", 0, 1)
+        self.frame.readonly = 0  # Drawing goes straight into self.pixels instead of a copy
+        self.writer = RGB565Writer(display, width, height)
+
+        # Last frame sent, and scratch arrays for the diff. Pixels are compared
+        # as one uint32 per RGBX pixel.
+        self._last = numpy.zeros_like(self.pixels)
+        self._valid = False
+        self._words = self.pixels.view(numpy.uint32).reshape(height, width)
+        self._last_words = self._last.view(numpy.uint32).reshape(height, width)
+        self._changed = numpy.empty((height, width), bool)
+        self._rows = numpy.empty(height, bool)
+        self._cols = numpy.empty(width, bool)
+
+        # Statistics
+        self.frames = 0
+        self.frames_skipped = 0
+        self.windows = 0
+        self.bytes_pushed = 0
+        self.bytes_saved = 0
+
+    def push(self):
+        """Send the changes between self.frame and the last pushed frame."""
+        self.frames += 1
+        height, width = self.pixels.shape[:2]
+        full_bytes = width * height * self.BYTES_PER_PIXEL
+
+        if not self._valid:
+            rects = [(0, 0, width, height)]
+        else:
+            rects = self.dirty_rects()
+            if not rects:
+                self.frames_skipped += 1
+                self.bytes_saved += full_bytes
+                return 0
+
+        sent = 0
+        for rect in rects:
+            self._push_rect(rect)
+            sent += (rect[2] - rect[0]) * (rect[3] - rect[1]) * self.BYTES_PER_PIXEL
+
+        self.windows += len(rects)
+        self.bytes_pushed += sent
+        self.bytes_saved += full_bytes - sent
+        self._valid = True
+        return sent
+
+    def dirty_rects(self):
+        """Bounding rectangles (left, top, right, bottom) of pixels changed since the last push."""
+        numpy.not_equal(self._words, self._last_words, out=self._changed)
+        numpy.any(self._changed, axis=1, out=self._rows)
+        if not self._rows.any():
+            return []
+        first = int(self._rows.argmax())
+        last = len(self._rows) - int(self._rows[::-1].argmax())
+
+        # One bounding box per band, so a change at the top and one at the
+        # bottom of the screen don't drag the whole middle along
+        rects = []
+        width = self.pixels.shape[1]
+        for top in range(first, last, self.band_height):
+            bottom = min(top + self.band_height, last)
+            rows = self._rows[top:bottom]
+            if not rows.any():
+                continue
+            cols = numpy.any(self._changed[top:bottom], axis=0, out=self._cols)
+            rects.append((int(cols.argmax()), top + int(rows.argmax()),
+                          width - int(cols[::-1].argmax()), bottom - int(rows[::-1].argmax())))
+        return self._merge(rects)
+
+    def _merge(self, rects):
+        """Merge vertically adjacent rectangles when one window is cheaper."""
+        merged = []
+        for rect in rects:
+            if merged:
+                prev = merged[-1]
+                union = (min(prev[0], rect[0]), prev[1], max(prev[2], rect[2]), rect[3])
+                if self._cost(union) <= self._cost(prev) + self._cost(rect):
+                    merged[-1] = union
+                    continue
+            merged.append(rect)
+        return merged
+
+    def _cost(self, rect):
+        """Approximate SPI bytes to push one window."""
+        area = (rect[2] - rect[0]) * (rect[3] - rect[1])
+        return area * self.BYTES_PER_PIXEL + self.WINDOW_OVERHEAD
+
+    def _push_rect(self, rect):
+        """Windowed write of one rectangle, mapped into panel coordinates."""
+        left, top, right, bottom = rect
+        height, width = self.pixels.shape[:2]
+        x, y = self._panel_origin((width, height), rect)
+        window = self.pixels[top:bottom, left:right]
+        self.writer.write(window, x, y, self.display.rotation)
+        self._last[top:bottom, left:right] = window
+
+    def _panel_origin(self, size, rect):
+        """
+        The crop is rotated by display.rotation before writing (as image()
+        would), and x/y are in unrotated panel coordinates. Map the crop's
+        corner accordingly.
+        """
+        width, height = size
+        left, top, right, bottom = rect
+        rotation = self.display.rotation
+        if rotation == 90:
+            return top, width - right
+        if rotation == 180:
+            return width - right, height - bottom
+        if rotation == 270:
+            return height - bottom, left
+        return left, top
+
+    def stats(self):
+        """Push statistics."""
+        return {
+            'frames': self.frames,
+            'frames_skipped': self.frames_skipped,
+            'windows': self.windows,
+            'bytes_pushed': self.bytes_pushed,
+            'bytes_saved': self.bytes_saved,
+            'spi_chunks': self.writer.chunks,
+            'rgb565_ms': round(self.writer.convert_ms / self.writer.conversions, 4) if self.writer.conversions else 0.0,
+        }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Temperature / Humidity Fusion
+Streaming per-quantity Kalman filter over several sensors
+
+Each new raw sample (AHT20, BMP280, SCD-41) is corrected by its calibration
+offset and folded into a 1-D random-walk Kalman filter, weighted by that
+sensor's measurement noise. This runs once per sample rather than once per
+frame; the display and exporters just read the published result.
+
+Published fields: temperature, temperature_sigma, humidity, humidity_sigma
+(sigma is the filter's 1-standard-deviation uncertainty).
+"""
+
+import math
+
+# Measurement noise (1 sigma) per raw field. The BMP280 sits close to the
+# Pi and the SCD-41 self-heats, so they are trusted less than the AHT20.
+SOURCES = {
+    'temperature': {
+        'temperature_aht': 0.3,
+        'temperature_bmp': 1.0,
+        'temperature_scd': 0.8,
+    },
+    'humidity': {
+        'humidity_aht': 2.0,
+        'humidity_scd': 6.0,
+    },
+}
+
+# How fast the true value may wander, as variance per second
+PROCESS_NOISE = {
+    'temperature': 0.002,   # (degC)^2/s
+    'humidity': 0.02,       # (%RH)^2/s
+}
+
+LIMITS = {
+    'humidity': (0.0, 100.0),
+}
+
+
+class KalmanEstimate:
+    """Scalar random-walk Kalman filter fed by several noisy sources."""
+
+    def __init__(self, process_noise, sources):
+        self.process_noise = process_noise
+        self.variances = {field: sigma ** 2 for field, sigma in sources.items()}
+        self.value = None
+        self.variance = None
+        self.updated = None
+
+    @property
+    def sigma(self):
+        return math.sqrt(self.variance) if self.variance is not None else None
+
+    def update(self, field, measurement, now):
+        """Fold in one corrected measurement from a source."""
+        r = self.variances[field]
+        if self.value is None:
+            self.value, self.variance, self.updated = measurement, r, now
+            return
+        # Predict: uncertainty grows with time since the last sample
+        self.variance += self.process_noise * max(now - self.updated, 0.0)
+        # Correct
+        gain = self.variance / (self.variance + r)
+        self.value += gain * (measurement - self.value)
+        self.variance *= 1 - gain
+        self.updated = now
+
+
+class SensorFusion:
+    """Fuses raw sensor_data fields into one temperature and humidity."""
+
+    def __init__(self, calibration=None):
+        # Offsets added to raw readings, e.g. {'temperature_bmp': -1.2}
+        self.calibration = dict(calibration or {})
+        self.estimates = {
+            name: KalmanEstimate(PROCESS_NOISE[name], sources)
+            for name, sources in SOURCES.items()
+        }
+        self._source_of = {
+            field: name for name, sources in SOURCES.items() for field in sources
+        }
+
+    def update(self, values, now):
+        """Feed newly published raw values; return fused fields that changed."""
+        changed = set()
+        for field, value in values.items():
+            name = self._source_of.get(field)
+            if name is None or value is None:
+                continue
+            self.estimates[name].update(field, value + self.calibration.get(field, 0.0), now)
+            changed.add(name)
+
+        fused = {}
+        for name in changed:
+            estimate = self.estimates[name]
+            value = estimate.value
+            low, high = LIMITS.get(name, (-math.inf, math.inf))
+            fused[name] = min(max(value, low), high)
+            fused[f"{name}_sigma"] = estimate.sigma
+        return fused
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+PA1010D GPS Reader
+Drains the GPS I2C buffer in bulk reads and parses NMEA as it streams in
+
+The PA1010D queues NMEA output in an internal buffer and pads reads with
+'\\n' once it is empty. Reading 255 bytes per transaction until the padding
+shows up keeps the buffer from overflowing, and the streaming parser turns
+each complete GGA/RMC sentence into a fix update right away.
+"""
+
+import time
+
+MAX_SENTENCE = 82   # NMEA 0183 limit, including $ and CRLF
+
+
+def _checksum_ok(line):
+    """Validate the *hh checksum of a sentence (without CRLF)."""
+    body, star, checksum = line[1:].rpartition(b'*')
+    if not star or len(checksum) != 2:
+        return False
+    calc = 0
+    for byte in body:
+        calc ^= byte
+    try:
+        return calc == int(checksum, 16)
+    except ValueError:
+        return False
+
+
+def _coordinate(value, hemisphere, degree_digits):
+    """ddmm.mmmm / dddmm.mmmm plus N/S/E/W to signed decimal degrees."""
+    if not value:
+        return None
+    degrees = int(value[:degree_digits]) + float(value[degree_digits:]) / 60
+    return -degrees if hemisphere in ('S', 'W') else degrees
+
+
+class NMEAParser:
+    """Incremental NMEA parser: feed() bytes, get fix updates back."""
+
+    def __init__(self):
+        self._line = bytearray()
+        self.sentences = 0
+        self.parse_errors = 0
+        self.overruns = 0
+
+    def feed(self, data):
+        """Consume raw bytes; return a dict of sensor_data updates (may be empty)."""
+        updates = {}
+        for byte in data:
+            if byte == 0x0A:  # LF ends a sentence (and is the PA1010D's padding)
+                if self._line:
+                    self._sentence(bytes(self._line).rstrip(b'\r'), updates)
+                    self._line.clear()
+            elif byte == 0x24 and self._line:  # '$' mid-line: previous sentence was cut
+                self.overruns += 1
+                self._line[:] = b'$'
+            else:
+                self._line.append(byte)
+                if len(self._line) > MAX_SENTENCE:
+                    # Lost a line end somewhere - drop the fragment
+                    self.overruns += 1
+                    self._line.clear()
+        return updates
+
+    def _sentence(self, line, updates):
+        """Parse one complete line into updates."""
+        if not line.startswith(b'$') or not _checksum_ok(line):
+            self.parse_errors += 1
+            return
+        fields = line[1:line.rindex(b'*')].decode('ascii', 'replace').split(',')
+        kind = fields[0][2:]  # Drop the talker ID (GP, GN, GL...)
+        try:
+            if kind == 'GGA' and len(fields) >= 10:
+                self._gga(fields, updates)
+            elif kind == 'RMC' and len(fields) >= 7:
+                self._rmc(fields, updates)
+            else:
+                return
+        except ValueError:
+            self.parse_errors += 1
+            return
+        self.sentences += 1
+
+    def _gga(self, f, updates):
+        """$xxGGA,time,lat,N,lon,E,quality,sats,hdop,alt,M,..."""
+        quality = int(f[6] or 0)
+        updates['gps_fix'] = quality > 0
+        updates['satellites'] = int(f[7]) if f[7] else None
+        if quality > 0:
+            updates['latitude'] = _coordinate(f[2], f[3], 2)
+            updates['longitude'] = _coordinate(f[4], f[5], 3)
+            updates['gps_altitude'] = float(f[9]) if f[9] else None
+
+    def _rmc(self, f, updates):
+        """$xxRMC,time,status,lat,N,lon,E,..."""
+        valid = f[2] == 'A'
+        updates['gps_fix'] = valid
+        if valid:
+            updates['latitude'] = _coordinate(f[3], f[4], 2)
+            updates['longitude'] = _coordinate(f[5], f[6], 3)
+
+
+class GPSReader:
+    """Bulk I2C reader for the PA1010D feeding an NMEAParser."""
+
+    def __init__(self, i2c, address=0x10, chunk_size=255, max_reads=16, device=None):
+        """device replaces the I2C device (anything with a readinto() context)."""
+        if device is None:
+            from adafruit_bus_device.i2c_device import I2CDevice
+            device = I2CDevice(i2c, address)
+        self.device = device
+        self.buffer = bytearray(chunk_size)
+        self.max_reads = max_reads
+        self.parser = NMEAParser()
+        self.bytes_read = 0
+        self.started = time.monotonic()
+
+    def drain(self):
+        """Read until the GPS buffer is empty; return updates or None if nothing new."""
+        updates = {}
+        for _ in range(self.max_reads):
+            with self.device as i2c:
+                i2c.readinto(self.buffer)
+            self.bytes_read += len(self.buffer)
+            updates.update(self.parser.feed(self.buffer))
+            # Bare LF padding (no CR before it) means the buffer ran dry
+            if self.buffer.endswith(b'\n\n'):
+                break
+        else:
+            # Still data after max_reads - we are falling behind the GPS
+            self.parser.overruns += 1
+        return updates or None
+
+    def stats(self):
+        """Sentence rate, parse errors and overruns."""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return {
+            'sentences': self.parser.sentences,
+            'sentences_per_second': self.parser.sentences / elapsed,
+            'parse_errors': self.parser.parse_errors,
+            'overruns': self.parser.overruns,
+            'bytes_read': self.bytes_read,
+        }
@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+Station Hardware Backends
+Where the station's I2C devices, display, backlight and buttons come from
+
+PiBackend opens the real hardware: the Blinka board, the Mini PiTFT ST7789
+and the Adafruit sensor drivers (imported only when used). SimBackend
+provides software stand-ins with the same attributes the station uses, so
+the full station loop runs on any Linux box:
+
+- SimDS3231, SimAHT20, SimBMP280, SimSCD41, SimPA1010D: slowly drifting
+  readings with Gaussian noise and a per-read delay like the real bus
+- SimDisplay: keeps what the panel would show, optionally saved as a PNG
+- SimButtons: pins that tests (or a script) can press and release
+
+latency and noise scale every simulated device's defaults (0 disables).
+"""
+
+import math
+import random
+import struct
+import threading
+import time
+
+import numpy
+from PIL import Image
+
+from burst_read import (BMP280_DATA, BMP280_MEASURING, BMP280_MODE_FORCE, BMP280_MODE_NORMAL, altitude,
+                        compensate_pressure, compensate_temperature)
+from gps_reader import GPSReader
+
+# I2C address of each station device
+ADDRESSES = {'rtc': 0x68, 'aht': 0x38, 'bmp': 0x77, 'scd': 0x62, 'gps': 0x10}
+
+
+class PiBackend:
+    """The real Raspberry Pi hardware."""
+
+    name = 'pi'
+
+    def __init__(self):
+        self._i2c = None
+        self._scan = None
+
+    def i2c(self):
+        """Shared I2C bus (opened on first use)."""
+        if self._i2c is None:
+            import board
+            self._i2c = board.I2C()
+        return self._i2c
+
+    def scan(self):
+        """Addresses that answer on the bus (scanned once, then cached)."""
+        if self._scan is None:
+            i2c = self.i2c()
+            while not i2c.try_lock():
+                pass
+            try:
+                self._scan = set(i2c.scan())
+            finally:
+                i2c.unlock()
+        return self._scan
+
+    def display(self):
+        """Mini PiTFT ST7789 and its backlight pin."""
+        import board
+        import digitalio
+        # Display - use RGB Display library (PIL-compatible)
+        from adafruit_rgb_display import st7789
+
+        # Configuration for CS and DC pins (PiTFT defaults)
+        cs_pin = digitalio.DigitalInOut(board.CE0)
+        dc_pin = digitalio.DigitalInOut(board.D25)
+        reset_pin = digitalio.DigitalInOut(board.D27)
+
+        # Backlight control
+        backlight = digitalio.DigitalInOut(board.D22)
+        backlight.switch_to_output()
+        backlight.value = True
+
+        # Setup SPI bus
+        spi = board.SPI()
+
+        # Baudrate - can go up to 64MHz for faster updates
+        BAUDRATE = 64000000
+
+        # Create the ST7789 display using adafruit_rgb_display
+        # For 135x240 Mini PiTFT in landscape (rotation=270)
+        display = st7789.ST7789(
+            spi,
+            cs=cs_pin,
+            dc=dc_pin,
+            rst=reset_pin,
+            baudrate=BAUDRATE,
+            width=135,
+            height=240,
+            x_offset=53,
+            y_offset=40,
+            rotation=270,  # Landscape orientation
+        )
+        return display, backlight
+
+    def attach_buttons(self, buttons):
+        """Connect ButtonInput to the Mini PiTFT buttons."""
+        # Button A - GPIO 23, Button B - GPIO 24
+        if buttons.open_gpiod({'A': 23, 'B': 24}):
+            return
+
+        # No edge detection - sample the pins on the input thread
+        import board
+        import digitalio
+        pins = {}
+        for name, pin in (('A', board.D23), ('B', board.D24)):
+            pins[name] = digitalio.DigitalInOut(pin)
+            pins[name].direction = digitalio.Direction.INPUT
+            pins[name].pull = digitalio.Pull.UP
+        buttons.use_pins(pins)
+
+    def rtc(self):
+        import adafruit_ds3231
+        return adafruit_ds3231.DS3231(self.i2c())
+
+    def aht(self):
+        import adafruit_ahtx0
+        return adafruit_ahtx0.AHTx0(self.i2c())
+
+    def bmp(self):
+        import adafruit_bmp280
+        return adafruit_bmp280.Adafruit_BMP280_I2C(self.i2c())
+
+    def scd(self):
+        import adafruit_scd4x
+        return adafruit_scd4x.SCD4X(self.i2c())
+
+    def gps(self):
+        import adafruit_gps
+        return adafruit_gps.GPS_GtopI2C(self.i2c())
+
+    def gps_reader(self):
+        return GPSReader(self.i2c())
+
+    def close(self):
+        pass
+
+
+class SimBackend:
+    """Simulated devices for running the station off-Pi."""
+
+    name = 'sim'
+
+    def __init__(self, latency=1.0, noise=1.0, seed=None, png_path=None, png_interval=1.0, absent=()):
+        """absent names devices (as in ADDRESSES) to leave off the simulated bus."""
+        self.absent = set(absent)
+        self.devices = {}  # Last device opened under each name
+        self.latency = latency
+        self.noise = noise
+        self.random = random.Random(seed)
+        self.screen = SimDisplay(png_path, png_interval)
+        self.backlight = SimPin()
+        self.buttons = SimButtons()
+
+    def _device(self, name, cls, *args):
+        if name in self.absent:
+            raise ValueError(f"No I2C device at address: 0x{ADDRESSES[name]:x}")
+        device = self.devices[name] = cls(self.latency, self.noise, random.Random(self.random.random()), *args)
+        return device
+
+    def unplug(self, name):
+        """Pull a device off the bus: reads and re-opens fail until plug()."""
+        self.absent.add(name)
+        if name in self.devices:
+            self.devices[name].unplugged = True
+
+    def plug(self, name):
+        """Put a device back; the station has to re-open it."""
+        self.absent.discard(name)
+
+    def scan(self):
+        return {address for name, address in ADDRESSES.items() if name not in self.absent}
+
+    def display(self):
+        return self.screen, self.backlight
+
+    def attach_buttons(self, buttons):
+        buttons.use_pins(self.buttons.pins)
+
+    def rtc(self):
+        return self._device('rtc', SimDS3231)
+
+    def aht(self):
+        return self._device('aht', SimAHT20)
+
+    def bmp(self):
+        return self._device('bmp', SimBMP280)
+
+    def scd(self):
+        return self._device('scd', SimSCD41)
+
+    def gps(self):
+        self._gps = self._device('gps', SimPA1010D)
+        return self._gps
+
+    def gps_reader(self):
+        return GPSReader(None, device=self._gps)
+
+    def close(self):
+        self.screen.save()
+
+
+class SimPin:
+    """Digital pin stand-in (backlight, button)."""
+
+    def __init__(self, value=True):
+        self.value = value
+
+    def switch_to_output(self):
+        pass
+
+
+class SimButtons:
+    """Mini PiTFT buttons, active low like the real ones."""
+
+    def __init__(self):
+        self.pins = {'A': SimPin(), 'B': SimPin()}
+
+    def press(self, name):
+        self.pins[name].value = False
+
+    def release(self, name):
+        self.pins[name].value = True
+
+    def tap(self, name, hold=0.1):
+        """Press and release (blocks for hold seconds)."""
+        self.press(name)
+        time.sleep(hold)
+        self.release(name)
+
+
+class SimDisplay:
+    """
+    ST7789 stand-in; keeps the panel contents and can save them as a PNG.
+
+    Mirrors adafruit_rgb_display down to the SPI bytes: image() converts the
+    same way the driver does, and the panel decodes CASET / RASET / RAMWR
+    sent through write() and spi_device, so raw window writes work too.
+    Pixels are kept as RGB565 (like the controller's GRAM) and only turned
+    back into an image for screenshot().
+    """
+
+    # Command codes and offsets, as in adafruit_rgb_display.st7789
+    _COLUMN_SET = 0x2A
+    _PAGE_SET = 0x2B
+    _RAM_WRITE = 0x2C
+    _X_START = 0
+    _Y_START = 0
+
+    def __init__(self, png_path=None, png_interval=1.0, width=135, height=240, rotation=270):
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.png_path = png_path
+        self.png_interval = png_interval
+        self.gram = numpy.zeros((height, width), ">u2")
+        self.dc_pin = SimPin()
+        self.spi_device = _SimSPIDevice(self)
+        self.writes = 0          # RAMWR windows
+        self.spi_writes = 0      # SPI transfers, commands included
+        self.bytes_written = 0   # Pixel data bytes
+        self._command = None
+        self._window = (0, 0, 0, 0)
+        self._ram = bytearray(width * height * 2)
+        self._ram_used = 0
+        self._saved = 0.0
+
+    def image(self, img, rotation=None, x=0, y=0):
+        """Windowed write, with the same rotation, bounds and conversion as adafruit_rgb_display."""
+        if rotation is None:
+            rotation = self.rotation
+        width, height = img.size
+        if rotation in (90, 270):
+            width, height = height, width
+        if width + x > self.width or height + y > self.height:
+            raise ValueError("Image must not exceed dimensions of display")
+        # The driver's image_to_data(): NumPy RGB565, then a list of ints
+        data = numpy.array(img.rotate(rotation, expand=True).convert("RGB")).astype("uint16")
+        color = ((data[:, :, 0] & 0xF8) << 8) | ((data[:, :, 1] & 0xFC) << 3) | (data[:, :, 2] >> 3)
+        pixels = numpy.dstack(((color >> 8) & 0xFF, color & 0xFF)).flatten().tolist()
+        self._block(x, y, x + width - 1, y + height - 1, pixels)
+
+    def _block(self, x0, y0, x1, y1, data):
+        self.write(self._COLUMN_SET, self._encode_pos(x0 + self._X_START, x1 + self._X_START))
+        self.write(self._PAGE_SET, self._encode_pos(y0 + self._Y_START, y1 + self._Y_START))
+        self.write(self._RAM_WRITE, data)
+
+    def _encode_pos(self, x, y):
+        return struct.pack(">HH", x, y)
+
+    def write(self, command=None, data=None):
+        if command is not None:
+            self.dc_pin.value = 0
+            with self.spi_device as spi:
+                spi.write(bytearray([command]))
+        if data is not None:
+            self.dc_pin.value = 1
+            with self.spi_device as spi:
+                spi.write(data)
+
+    def _receive(self, data):
+        """One SPI transfer: a command byte or its parameters / pixel data."""
+        self.spi_writes += 1
+        if not self.dc_pin.value:
+            self._command = data[0]
+            if self._command == self._RAM_WRITE:
+                self._ram_used = 0
+            return
+        if self._command == self._COLUMN_SET:
+            x0, x1 = struct.unpack(">HH", bytes(data))
+            self._window = (x0, self._window[1], x1, self._window[3])
+        elif self._command == self._PAGE_SET:
+            y0, y1 = struct.unpack(">HH", bytes(data))
+            self._window = (self._window[0], y0, self._window[2], y1)
+        elif self._command == self._RAM_WRITE:
+            if isinstance(data, list):
+                data = bytes(data)  # What spidev does with the driver's list
+            end = self._ram_used + len(data)
+            self._ram[self._ram_used:end] = data
+            self._ram_used = end
+            self.bytes_written += len(data)
+            x0, y0, x1, y1 = self._window
+            width, height = x1 - x0 + 1, y1 - y0 + 1
+            if end >= width * height * 2:
+                self._show(x0, y0, width, height)
+
+    def _show(self, x, y, width, height):
+        """Copy a complete RAMWR window into GRAM."""
+        color = numpy.frombuffer(self._ram, dtype=">u2", count=width * height)
+        self.gram[y:y + height, x:x + width] = color.reshape(height, width)
+        self._ram_used = 0
+        self.writes += 1
+        if self.png_path:
+            now = time.monotonic()
+            if now - self._saved >= self.png_interval:
+                self._saved = now
+                self.save()
+
+    @property
+    def panel(self):
+        """GRAM as an RGB image, in panel orientation."""
+        color = self.gram
+        rgb = numpy.empty(color.shape + (3,), numpy.uint8)
+        rgb[..., 0] = (color >> 8) & 0xF8
+        rgb[..., 1] = (color >> 3) & 0xFC
+        rgb[..., 2] = (color << 3) & 0xF8
+        return Image.fromarray(rgb, "RGB")
+
+    def screenshot(self):
+        """What the panel shows, the right way up."""
+        panel = self.panel
+        return panel.rotate(-self.rotation, expand=True) if self.rotation else panel
+
+    def save(self):
+        if self.png_path:
+            self.screenshot().save(self.png_path)
+
+
+class _SimSPIDevice:
+    """Chip-select context like adafruit_bus_device's SPIDevice."""
+
+    def __init__(self, display):
+        self.display = display
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, buf, start=0, end=None):
+        self.display._receive(buf[start:end])
+
+
+class SimDevice:
+    """Base for simulated sensors: bus delay and drifting, noisy signals."""
+
+    LATENCY = 0.001       # Seconds per bus transaction, before scaling
+    INIT_LATENCY = 0.002  # Driver setup (resets, calibration)
+
+    def __init__(self, latency, noise, rng):
+        time.sleep(self.INIT_LATENCY * latency)
+        self.scale = latency
+        self.latency = self.LATENCY * latency
+        self.noise = noise
+        self.random = rng
+        self._signals = {}
+        self._lock = threading.Lock()
+        self.unplugged = False
+        self.transactions = 0
+
+    def _bus(self, transactions=1):
+        if self.unplugged:
+            raise OSError(121, "Remote I/O error")
+        self.transactions += transactions
+        if self.latency:
+            time.sleep(self.latency * transactions)
+
+    def _signal(self, name, mean, drift, sigma, period=86400.0):
+        """mean + a daily-ish cycle + a random walk, plus measurement noise."""
+        with self._lock:
+            walk = self._signals.get(name, 0.0) + self.random.gauss(0, drift)
+            walk *= 0.999  # Pull the walk back toward the mean
+            self._signals[name] = walk
+            noise = self.random.gauss(0, sigma * self.noise)
+        cycle = drift * 50 * math.sin(2 * math.pi * time.time() / period)
+        return mean + cycle + walk + noise
+
+
+class SimDS3231(SimDevice):
+
+    @property
+    def datetime(self):
+        self._bus()
+        return time.localtime()
+
+
+class SimAHT20(SimDevice):
+    """Like the driver, every property read triggers an ~80ms measurement."""
+
+    LATENCY = 0.08
+    INIT_LATENCY = 0.06  # Soft reset and calibration
+
+    def _readdata(self):
+        self._bus()
+        self._temp = self._signal('temperature', 22.5, 0.02, 0.05)
+        self._humidity = min(100.0, max(0.0, self._signal('humidity', 45.0, 0.05, 0.3)))
+
+    @property
+    def temperature(self):
+        self._readdata()
+        return self._temp
+
+    @property
+    def relative_humidity(self):
+        self._readdata()
+        return self._humidity
+
+
+class SimBMP280(SimDevice):
+    """
+    Register-level model: like the driver, every property read runs a forced
+    conversion (the driver leaves the sensor in sleep mode) and compensates
+    raw register values; pressure and altitude re-read the temperature.
+    """
+
+    LATENCY = 0.003
+    CONVERSION = 0.043  # Forced conversion at the driver's x2 / x16 oversampling
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.sea_level_pressure = 1013.25
+        self._mode = 0x00  # Sleep
+        self._busy_until = 0.0
+        self._data = bytes(6)
+        # Calibration example from the datasheet
+        self._temp_calib = [27504, 26435, -1000]
+        self._pressure_calib = [36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000]
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        self._bus()
+        if value == BMP280_MODE_FORCE:
+            self._busy_until = time.monotonic() + self.CONVERSION * self.scale
+            self._data = self._sample()
+        else:
+            self._mode = value
+
+    def _get_status(self):
+        self._bus()
+        return BMP280_MEASURING if time.monotonic() < self._busy_until else 0
+
+    def _read_register(self, register, length):
+        self._bus()
+        if self._mode == BMP280_MODE_NORMAL:
+            self._data = self._sample()
+        return self._data[register - BMP280_DATA:register - BMP280_DATA + length]
+
+    def _sample(self):
+        """Raw data registers for the current temperature and pressure."""
+        temperature = self._signal('temperature', 23.1, 0.02, 0.02)
+        pressure = self._signal('pressure', 1003.2, 0.01, 0.02)
+        raw_t = _invert(lambda raw: compensate_temperature(self._temp_calib, raw)[0], temperature)
+        t_fine = compensate_temperature(self._temp_calib, raw_t)[1]
+        raw_p = _invert(lambda raw: compensate_pressure(self._pressure_calib, t_fine, raw), pressure)
+        return (int(raw_p) << 4).to_bytes(3, 'big') + (int(raw_t) << 4).to_bytes(3, 'big')
+
+    def _read_temperature(self):
+        if self._mode != BMP280_MODE_NORMAL:
+            self.mode = BMP280_MODE_FORCE
+            while self._get_status() & BMP280_MEASURING:
+                time.sleep(0.002)
+        data = self._read_register(0xFA, 3)
+        self._t_fine = compensate_temperature(self._temp_calib, int.from_bytes(data, 'big') / 16)[1]
+
+    @property
+    def temperature(self):
+        self._read_temperature()
+        return self._t_fine / 5120.0
+
+    @property
+    def pressure(self):
+        self._read_temperature()
+        data = self._read_register(BMP280_DATA, 3)
+        return compensate_pressure(self._pressure_calib, self._t_fine, int.from_bytes(data, 'big') / 16)
+
+    @property
+    def altitude(self):
+        return altitude(self.pressure, self.sea_level_pressure)
+
+
+def _invert(func, target, low=0.0, high=float(1 << 20)):
+    """ADC value that a monotonic compensation function maps to target."""
+    rising = func(high) > func(low)
+    for _ in range(40):
+        middle = (low + high) / 2
+        if (func(middle) < target) == rising:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+class SimSCD41(SimDevice):
+    """A new measurement every 5s (30s in low-power mode) once started."""
+
+    INIT_LATENCY = 0.5  # The driver stops any running measurement first
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._period = None
+        self._next = None
+        self._co2 = self._temp = self._humidity = None
+
+    def _start(self, period):
+        self._bus()
+        self._period = period
+        self._next = time.monotonic() + period
+
+    def start_periodic_measurement(self):
+        self._start(5.0)
+
+    def start_low_periodic_measurement(self):
+        self._start(30.0)
+
+    def stop_periodic_measurement(self):
+        self._bus()
+        time.sleep(0.5 * self.scale)  # The real sensor needs 500ms to stop
+        self._period = None
+
+    @property
+    def data_ready(self):
+        self._bus()
+        return self._period is not None and time.monotonic() >= self._next
+
+    def _measure(self):
+        if self.data_ready:
+            self._next += self._period
+            self._co2 = max(400, int(self._signal('co2', 650, 2.0, 8.0, period=3600.0)))
+            self._temp = self._signal('temperature', 24.0, 0.02, 0.1)
+            self._humidity = self._signal('humidity', 40.0, 0.05, 0.5)
+
+    @property
+    def CO2(self):
+        self._measure()
+        return self._co2
+
+    @property
+    def temperature(self):
+        self._measure()
+        return self._temp
+
+    @property
+    def relative_humidity(self):
+        self._measure()
+        return self._humidity
+
+
+class SimPA1010D(SimDevice):
+    """
+    GPS: send_command() like GPS_GtopI2C, plus the I2C byte stream read by
+    GPSReader - one GGA and RMC sentence per second, padded with '\\n' once
+    the buffer is empty. Gets a fix fix_after seconds after power-up.
+    """
+
+    LATENCY = 0.006  # 255-byte read at 400kHz
+    INIT_LATENCY = 0.02
+    LATITUDE = 32.7555
+    LONGITUDE = -97.3308
+    BUFFER = 2048  # Older output is lost if nobody reads it
+
+    def __init__(self, *args, fix_after=5.0):
+        super().__init__(*args)
+        self.commands = []
+        self.started = time.time()
+        self.fix_after = fix_after
+        self._pending = bytearray()
+        self._second = int(self.started)
+
+    def send_command(self, command):
+        self.commands.append(command)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def readinto(self, buffer):
+        self._bus()
+        now = int(time.time())
+        while self._second < now:
+            self._second += 1
+            self._pending += self._sentences(self._second)
+        del self._pending[:-self.BUFFER]
+        count = min(len(buffer), len(self._pending))
+        buffer[:count] = self._pending[:count]
+        buffer[count:] = b'\n' * (len(buffer) - count)
+        del self._pending[:count]
+
+    def _sentences(self, second):
+        stamp = time.strftime('%H%M%S', time.gmtime(second))
+        date = time.strftime('%d%m%y', time.gmtime(second))
+        if second - self.started < self.fix_after:
+            return _nmea(f"GPGGA,{stamp}.000,,,,,0,00,,,M,,M,,") + \
+                _nmea(f"GPRMC,{stamp}.000,V,,,,,,,{date},,,N")
+        lat = _ddmm(self._signal('latitude', self.LATITUDE, 0.0, 0.00001), 2, 'N', 'S')
+        lon = _ddmm(self._signal('longitude', self.LONGITUDE, 0.0, 0.00001), 3, 'E', 'W')
+        altitude = self._signal('altitude', 198.0, 0.05, 1.5)
+        satellites = 8 + self.random.randrange(3)
+        return _nmea(f"GPGGA,{stamp}.000,{lat},{lon},1,{satellites:02d},0.9,{altitude:.1f},M,-23.0,M,,") + \
+            _nmea(f"GPRMC,{stamp}.000,A,{lat},{lon},0.00,0.00,{date},,,A")
+
+
+def _ddmm(value, degree_digits, positive, negative):
+    """Decimal degrees as NMEA (d)ddmm.mmmm,H"""
+    hemisphere = positive if value >= 0 else negative
+    value = abs(value)
+    degrees = int(value)
+    return f"{degrees:0{degree_digits}d}{(value - degrees) * 60:07.4f},{hemisphere}"
+
+
+def _nmea(body):
+    """Frame a sentence body with $, checksum and CRLF."""
+    checksum = 0
+    for char in body.encode('ascii'):
+        checksum ^= char
+    return f"${body}*{checksum:02X}\r\n".encode('ascii')
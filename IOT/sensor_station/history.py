@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Sensor History Ring Buffer
+Fixed-capacity, array-backed store of recent readings
+
+One preallocated array per field plus a timestamp column. Appends are O(1)
+and never allocate; windows are returned as memoryview slices over the same
+storage, so reading a trend doesn't copy it. Missing readings are stored as
+NaN. series() copies a window out under the store's lock, for other threads
+(the /api/history endpoint).
+
+At one row every 5s, 24h is 17280 rows - about 1.2MB for the default fields.
+"""
+
+import math
+import threading
+from array import array
+
+# sensor_data fields kept in history, with array typecode.
+# Lat/lon need double precision ('f' is only good to ~1m).
+HISTORY_FIELDS = [
+    ('temperature_aht', 'f'),
+    ('humidity_aht', 'f'),
+    ('temperature_bmp', 'f'),
+    ('pressure', 'f'),
+    ('altitude', 'f'),
+    ('co2', 'f'),
+    ('temperature_scd', 'f'),
+    ('humidity_scd', 'f'),
+    ('latitude', 'd'),
+    ('longitude', 'd'),
+    ('gps_altitude', 'f'),
+    ('satellites', 'f'),
+    ('temperature', 'f'),
+    ('humidity', 'f'),
+]
+
+
+class HistoryStore:
+    """Ring buffer with one column per field and a timestamp column."""
+
+    def __init__(self, fields=HISTORY_FIELDS, capacity=17280):
+        self.capacity = capacity
+        self.fields = [name for name, _ in fields]
+        self.times = array('d', [0.0]) * capacity
+        self.columns = {name: array(code, [math.nan]) * capacity for name, code in fields}
+        self.head = 0    # Next slot to write
+        self.count = 0   # Valid rows
+        self._lock = threading.Lock()  # Held while appending or copying a series
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        """Memory used by the columns."""
+        total = self.times.itemsize * self.capacity
+        for column in self.columns.values():
+            total += column.itemsize * self.capacity
+        return total
+
+    def append(self, timestamp, values):
+        """Add one row; fields missing from values (or None) are stored as NaN."""
+        with self._lock:
+            i = self.head
+            self.times[i] = timestamp
+            for name, column in self.columns.items():
+                value = values.get(name)
+                column[i] = math.nan if value is None else value
+            self.head = (i + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+
+    def _slot(self, n):
+        """Physical index of the n-th oldest row."""
+        return (self.head - self.count + n) % self.capacity
+
+    def _first_since(self, since):
+        """Logical index of the first row with timestamp >= since (binary search)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[self._slot(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _segments(self, column, start):
+        """Zero-copy slices covering logical rows start..end, oldest first."""
+        view = memoryview(column)
+        first = self._slot(start)
+        length = self.count - start
+        if length <= 0:
+            return []
+        end = first + length
+        if end <= self.capacity:
+            return [view[first:end]]
+        return [view[first:], view[:end - self.capacity]]
+
+    def window(self, field, since=None):
+        """
+        (times, values) for rows with timestamp >= since (all rows if None).
+        Each is a list of one or two memoryview segments - two when the
+        window wraps around the end of the ring.
+        """
+        start = 0 if since is None else self._first_since(since)
+        return self._segments(self.times, start), self._segments(self.columns[field], start)
+
+    def series(self, field, since=None):
+        """[(timestamp, value), ...] since a time, oldest first, without missing readings (a copy)."""
+        with self._lock:
+            times, values = self.window(field, since)
+            return [(t, v) for t_seg, v_seg in zip(times, values) for t, v in zip(t_seg, v_seg)
+                    if v == v]
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Station Metrics
+Cheap always-on instrumentation: histograms, counters and gauges
+
+Recording a value is a bisect into a fixed bucket list plus a few adds
+under an uncontended lock, so it is safe to leave on in the hot paths (I2C
+reads, renders, SPI pushes) and to call from any thread.
+render_text() produces the Prometheus text exposition format for the
+local /metrics endpoint.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+# Bucket upper bounds in milliseconds (roughly 1-2.5-5 per decade)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def copy(self):
+        other = Histogram(self.buckets)
+        other.counts = list(self.counts)
+        other.count = self.count
+        other.sum = self.sum
+        other.max = self.max
+        return other
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+class Metrics:
+    """Registry of named, labelled metrics."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()  # Workers, the main loop and the web thread all record
+
+    def observe(self, name, value, **labels):
+        """Record a value (e.g. a duration in ms) in a histogram."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Increment a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def histogram(self, name, **labels):
+        """Copy of the histogram for name/labels, or None if nothing was recorded yet."""
+        with self._lock:
+            histogram = self.histograms.get(_key(name, labels))
+            return histogram.copy() if histogram else None
+
+    def merged(self, name):
+        """One histogram combining every label set of name."""
+        total = Histogram()
+        with self._lock:
+            for (key, _), histogram in self.histograms.items():
+                if key == name:
+                    total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+                    total.count += histogram.count
+                    total.sum += histogram.sum
+                    total.max = max(total.max, histogram.max)
+        return total
+
+    def counter_total(self, name):
+        """Sum of a counter over all label sets."""
+        with self._lock:
+            return sum(v for (key, _), v in self.counters.items() if key == name)
+
+    def render_text(self):
+        """Prometheus text format of every metric."""
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        # Copy first, then format without holding up the threads recording
+        with self._lock:
+            histograms = {key: histogram.copy() for key, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+
+        for (name, labels), histogram in sorted(histograms.items()):
+            header(name, 'histogram')
+            running = 0
+            for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                running += count
+                lines.append(f"{name}_bucket{_labels(labels, le=bound)} {running}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.sum:.3f}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, 'gauge')
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class PhaseTimer:
+    """Wall time of consecutive named phases (startup), also kept as gauges."""
+
+    def __init__(self, metrics=None, start=None):
+        self.metrics = metrics
+        self.started = self._last = start if start is not None else time.perf_counter()
+        self.phases = []  # (name, ms)
+
+    def mark(self, name):
+        """End the current phase, calling it name."""
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000
+        self._last = now
+        self.phases.append((name, ms))
+        if self.metrics:
+            self.metrics.set('startup_ms', round(ms, 1), phase=name)
+
+    @property
+    def total_ms(self):
+        return (self._last - self.started) * 1000
+
+    def summary(self):
+        return ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.phases)
+
+
+def _labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+def process_rss_bytes():
+    """Resident set size of this process from /proc/self/statm."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
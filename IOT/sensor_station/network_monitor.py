@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Background Network Monitor
+Keeps SSID, IP address and latency fresh without forking or blocking
+
+- SSID via the wireless extensions ioctl on interfaces in /proc/net/wireless
+- IP via SIOCGIFADDR on each interface (no `hostname -I`)
+- Latency via an unprivileged ICMP echo (or a TCP connect if ICMP sockets
+  are not permitted), waited on with select() in the monitor thread
+
+Nothing is probed while the overlay is hidden (or the screen is off); the
+thread just sleeps until set_active(True).
+"""
+
+import array
+import fcntl
+import select
+import socket
+import struct
+import threading
+import time
+
+SIOCGIFADDR = 0x8915
+SIOCGIWESSID = 0x8B1B
+IW_ESSID_MAX_SIZE = 32
+
+
+def wireless_interfaces():
+    """Wireless interfaces and link signal (dBm) from /proc/net/wireless."""
+    interfaces = {}
+    try:
+        with open('/proc/net/wireless') as f:
+            lines = f.readlines()[2:]  # Skip two header lines
+    except OSError:
+        return interfaces
+    for line in lines:
+        name, _, stats = line.partition(':')
+        fields = stats.split()
+        try:
+            interfaces[name.strip()] = int(float(fields[2]))
+        except (IndexError, ValueError):
+            interfaces[name.strip()] = None
+    return interfaces
+
+
+def get_ssid(sock, ifname):
+    """ESSID of a wireless interface, or None if not associated."""
+    essid = array.array('B', bytes(IW_ESSID_MAX_SIZE + 1))
+    address, length = essid.buffer_info()
+    # struct iwreq: ifr_name[16] + struct iw_point {pointer, length, flags}
+    request = bytearray(32)
+    struct.pack_into('16sPHH', request, 0, ifname.encode()[:15], address, length, 0)
+    fcntl.ioctl(sock.fileno(), SIOCGIWESSID, request)
+    ssid = essid.tobytes().rstrip(b'\0').decode(errors='replace')
+    return ssid or None
+
+
+def get_ip(sock, ifname):
+    """IPv4 address of an interface, or None."""
+    try:
+        request = struct.pack('256s', ifname.encode()[:15])
+        result = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+        return socket.inet_ntoa(result[20:24])
+    except OSError:
+        return None
+
+
+def _checksum(data):
+    """RFC 1071 internet checksum."""
+    if len(data) % 2:
+        data += b'\0'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def probe_latency(host, timeout=2.0, seq=1):
+    """Round-trip time to host in ms, or None if there was no reply."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+    except OSError:
+        # ICMP sockets not permitted (net.ipv4.ping_group_range) - time a TCP connect
+        return _probe_tcp(host, timeout)
+
+    with sock:
+        sock.setblocking(False)
+        header = struct.pack('!BBHHH', 8, 0, 0, 0, seq)  # Echo request
+        payload = b'sensor-station'
+        packet = struct.pack('!BBHHH', 8, 0, _checksum(header + payload), 0, seq) + payload
+        start = time.monotonic()
+        sock.sendto(packet, (host, 0))
+        deadline = start + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            readable, _, _ = select.select([sock], [], [], remaining)
+            if not readable:
+                return None
+            reply = sock.recv(1024)
+            # Kernel rewrites the id; match on type (echo reply) and sequence
+            if len(reply) >= 8 and reply[0] == 0 and struct.unpack('!H', reply[6:8])[0] == seq:
+                return (time.monotonic() - start) * 1000
+
+
+def _probe_tcp(host, timeout, port=53):
+    """Time a non-blocking TCP connect to host:port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.setblocking(False)
+        start = time.monotonic()
+        sock.connect_ex((host, port))
+        _, writable, _ = select.select([], [sock], [], timeout)
+        if writable and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+            return (time.monotonic() - start) * 1000
+        return None
+
+
+class NetworkMonitor:
+    """Refreshes network info on a background thread."""
+
+    def __init__(self, ping_host='1.1.1.1', interval=5.0, on_update=None):
+        self.ping_host = ping_host
+        self.on_update = on_update  # Called when values change
+        self.interval = interval    # Refresh period while active
+        self.active = False
+
+        # Latest values, read directly by the display
+        self.info = {
+            'ssid': None,
+            'ip': None,
+            'ping_ms': None,
+            'signal_dbm': None,
+            'updated': None,
+        }
+
+        self._seq = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the monitor thread."""
+        self._thread = threading.Thread(target=self._loop, name="network-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the monitor thread."""
+        self._stop.set()
+        self._wake.set()
+
+    def set_active(self, active):
+        """Refresh now and every interval while someone is looking; pause otherwise."""
+        self.active = active
+        if active:
+            self.refresh()
+
+    def refresh(self):
+        """Ask for an immediate refresh without waiting for it."""
+        self._wake.set()
+
+    def _loop(self):
+        """While active, refresh every interval; while paused, sleep until woken."""
+        while not self._stop.is_set():
+            if self.active:
+                self.update()
+                self._wake.wait(self.interval)
+            else:
+                self._wake.wait()
+            self._wake.clear()
+
+    def update(self):
+        """Refresh all values (runs in the monitor thread)."""
+        wireless = wireless_interfaces()
+        ssid = None
+        ip = None
+        signal = None
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for ifname in wireless:
+                    try:
+                        ssid = get_ssid(sock, ifname)
+                    except OSError:
+                        continue
+                    if ssid:
+                        signal = wireless[ifname]
+                        ip = get_ip(sock, ifname)
+                        break
+                if ip is None:
+                    # Wired or other interface
+                    for _, ifname in socket.if_nameindex():
+                        if ifname != 'lo':
+                            ip = get_ip(sock, ifname)
+                            if ip:
+                                break
+            self.info['ssid'] = ssid or "Not connected"
+            self.info['ip'] = ip or "No IP"
+            self.info['signal_dbm'] = signal
+        except Exception:
+            self.info['ssid'] = "Unknown"
+            self.info['ip'] = "Unknown"
+        if self.on_update:
+            self.on_update()  # Show SSID and IP without waiting for the ping
+
+        try:
+            self._seq = (self._seq + 1) & 0xFFFF
+            rtt = probe_latency(self.ping_host, seq=self._seq)
+            self.info['ping_ms'] = f"{rtt:.1f} ms" if rtt is not None else "FAIL"
+        except Exception:
+            self.info['ping_ms'] = "ERROR"
+        self.info['updated'] = time.monotonic()
+        if self.on_update:
+            self.on_update()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Reading Rollups
+Min / max / mean / count per field at minute, hour and day resolution
+
+Every sample updates one open bucket per resolution in place - a few
+comparisons and additions per field, however long the station has been
+running. When a sample falls into a new bucket the old one is closed. A
+background thread writes closed buckets, and the current state of the open
+ones, to a `rollups` table next to the reading log, one transaction per
+flush interval. On restart the open buckets are picked up from there, so
+an hour or a day in progress keeps accumulating.
+
+Buckets are aligned to UTC (days start at 00:00 UTC). Old minute and hour
+buckets are pruned (RETENTION); day buckets are kept forever.
+
+query() reads a range straight off the table's primary key, with the
+buckets still in memory merged in, so graphs and exports never touch the
+raw readings.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+
+from datalog import SYNC_MODES
+
+# Resolution name -> bucket length (seconds)
+RESOLUTIONS = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Resolution name -> seconds of buckets kept (None keeps everything)
+RETENTION = {'minute': 14 * 86400, 'hour': 2 * 365 * 86400, 'day': None}
+
+# Index of each statistic in a bucket's per-field list
+MIN, MAX, SUM, COUNT = range(4)
+
+
+class Bucket:
+    """Running statistics of every field over one interval."""
+
+    __slots__ = ('start', 'stats')
+
+    def __init__(self, start, stats=None):
+        self.start = start
+        self.stats = stats if stats is not None else {}  # field -> [min, max, sum, count]
+
+    def add(self, samples):
+        for name, value in samples:
+            stat = self.stats.get(name)
+            if stat is None:
+                self.stats[name] = [value, value, value, 1]
+                continue
+            if value < stat[MIN]:
+                stat[MIN] = value
+            if value > stat[MAX]:
+                stat[MAX] = value
+            stat[SUM] += value
+            stat[COUNT] += 1
+
+    def rows(self, resolution):
+        """Table rows for this bucket."""
+        return [(resolution, name, self.start) + tuple(stat) for name, stat in self.stats.items()]
+
+
+class RollupStore:
+    """Incrementally maintained, persisted rollups of station readings."""
+
+    def __init__(self, path, fields, resolutions=RESOLUTIONS, retention=RETENTION,
+                 flush_interval=60.0, fsync='batch'):
+        if fsync not in SYNC_MODES:
+            raise ValueError(f"fsync must be one of {', '.join(SYNC_MODES)}")
+        self.path = path
+        self.fields = list(fields)
+        self.resolutions = dict(resolutions)
+        self.retention = dict(retention)
+        self.flush_interval = flush_interval
+
+        self._open = {}     # resolution -> Bucket being filled
+        self._closed = []   # (resolution, Bucket) not yet written
+        self._lock = threading.Lock()     # Guards _open and _closed
+        self._db_lock = threading.Lock()  # Serializes use of the connection
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_prune = 0.0
+
+        # Statistics
+        self.samples = 0
+        self.buckets_closed = 0
+        self.rows_written = 0
+        self.write_errors = 0
+        self.last_flush_ms = 0.0
+
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"PRAGMA synchronous={SYNC_MODES[fsync]}")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            "resolution TEXT NOT NULL, field TEXT NOT NULL, start REAL NOT NULL, "
+            "min REAL, max REAL, sum REAL, count INTEGER, "
+            "PRIMARY KEY (resolution, field, start)) WITHOUT ROWID")
+        self.db.commit()
+        self._resume(time.time())
+
+    def _resume(self, now):
+        """Reload the buckets that were still open when the station stopped."""
+        for resolution, seconds in self.resolutions.items():
+            start = now - now % seconds
+            rows = self.db.execute(
+                "SELECT field, min, max, sum, count FROM rollups WHERE resolution = ? AND start = ?",
+                (resolution, start)).fetchall()
+            if rows:
+                self._open[resolution] = Bucket(start, {row[0]: list(row[1:]) for row in rows})
+
+    def add(self, timestamp, values):
+        """Fold one sample into every resolution (fields missing, None or NaN are skipped)."""
+        samples = []
+        for name in self.fields:
+            value = values.get(name)
+            if value is not None and not math.isnan(value):
+                samples.append((name, value))
+        with self._lock:
+            self.samples += 1
+            for resolution, seconds in self.resolutions.items():
+                start = timestamp - timestamp % seconds
+                bucket = self._open.get(resolution)
+                if bucket is None or bucket.start != start:
+                    if bucket is not None:
+                        self._closed.append((resolution, bucket))
+                        self.buckets_closed += 1
+                    bucket = self._open[resolution] = Bucket(start)
+                bucket.add(samples)
+
+    def start(self):
+        """Start the background flush thread."""
+        self._thread = threading.Thread(target=self._loop, name="rollups", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Write everything (open buckets included) and close."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5.0)
+        self.flush()
+        with self._db_lock:
+            self.db.close()
+
+    def _loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write closed buckets and the current open ones in one transaction."""
+        with self._lock:
+            closed, self._closed = self._closed, []
+            rows = [row for resolution, bucket in closed for row in bucket.rows(resolution)]
+            for resolution, bucket in self._open.items():
+                rows.extend(bucket.rows(resolution))
+        if not rows:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            with self._db_lock, self.db:
+                self.db.executemany("INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                if time.time() - self._last_prune > 3600:
+                    self._prune(time.time())
+        except sqlite3.Error as e:
+            self.write_errors += 1
+            print(f"✗ Rollup write failed: {e}")
+            with self._lock:
+                self._closed[:0] = closed  # Retry with the next flush
+            return 0
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def _prune(self, now):
+        """Drop buckets older than their resolution's retention (caller holds the transaction)."""
+        for resolution, keep in self.retention.items():
+            if keep:
+                self.db.execute("DELETE FROM rollups WHERE resolution = ? AND start < ?",
+                                (resolution, now - keep))
+        self._last_prune = now
+
+    def query(self, field, resolution, since=None, until=None):
+        """
+        [(start, min, max, mean, count), ...] for one field, oldest first,
+        including buckets not written yet.
+        """
+        if resolution not in self.resolutions:
+            raise ValueError(f"resolution must be one of {', '.join(self.resolutions)}")
+        if field not in self.fields:
+            raise ValueError(f"unknown field {field!r}")
+        since = -math.inf if since is None else since
+        until = math.inf if until is None else until
+        with self._db_lock:
+            rows = self.db.execute(
+                "SELECT start, min, max, sum, count FROM rollups "
+                "WHERE resolution = ? AND field = ? AND start >= ? AND start <= ? ORDER BY start",
+                (resolution, field, since, until)).fetchall()
+        buckets = {row[0]: row[1:] for row in rows}
+
+        # In memory is newer than anything on disk
+        with self._lock:
+            pending = [bucket for name, bucket in self._closed if name == resolution]
+            if resolution in self._open:
+                pending.append(self._open[resolution])
+            for bucket in pending:
+                stat = bucket.stats.get(field)
+                if stat and since <= bucket.start <= until:
+                    buckets[bucket.start] = tuple(stat)
+        return [(start, low, high, total / count, count)
+                for start, (low, high, total, count) in sorted(buckets.items()) if count]
+
+    def stats(self):
+        """Rollup statistics."""
+        return {
+            'samples': self.samples,
+            'buckets_closed': self.buckets_closed,
+            'pending_buckets': len(self._closed),
+            'rows_written': self.rows_written,
+            'write_errors': self.write_errors,
+            'last_flush_ms': self.last_flush_ms,
+        }
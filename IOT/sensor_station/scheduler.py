@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Deadline Scheduler
+Timer heap for the station's main loop
+
+The main loop asks how long until the next timer is due, sleeps on the
+event queue for that long, then runs whatever is due. Nothing wakes the
+process unless a timer fires or an event (button, new data) arrives.
+Lateness of each timer (loop lag) and wakeups per minute are recorded.
+"""
+
+import heapq
+import itertools
+import time
+
+
+class Timer:
+    """A scheduled callback; periodic if interval is set."""
+
+    def __init__(self, name, func, due, interval=None):
+        self.name = name
+        self.func = func
+        self.due = due
+        self.interval = interval
+        self.cancelled = False
+
+
+class Scheduler:
+    """Min-heap of timers keyed on monotonic due time."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self._heap = []
+        self._seq = itertools.count()  # Tie-breaker for equal due times
+        self.started = time.monotonic()
+
+        # Statistics
+        self.wakeups = 0
+        self.fired = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+
+    def every(self, interval, func, name=None, delay=None):
+        """Call func every interval seconds, first after delay (default interval)."""
+        due = time.monotonic() + (interval if delay is None else delay)
+        return self._push(Timer(name or func.__name__, func, due, interval))
+
+    def once(self, delay, func, name=None):
+        """Call func once after delay seconds."""
+        return self._push(Timer(name or func.__name__, func, time.monotonic() + delay))
+
+    def reschedule(self, timer, delay):
+        """Move a timer so it next fires delay seconds from now."""
+        timer.cancelled = True
+        replacement = Timer(timer.name, timer.func, time.monotonic() + delay, timer.interval)
+        return self._push(replacement)
+
+    def cancel(self, timer):
+        """Stop a timer (removed lazily when it reaches the top of the heap)."""
+        timer.cancelled = True
+
+    def _push(self, timer):
+        heapq.heappush(self._heap, (timer.due, next(self._seq), timer))
+        return timer
+
+    def next_timeout(self):
+        """Seconds until the next live timer is due (0 if overdue, None if idle)."""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def run_due(self):
+        """Run every timer that is due. Call once per main-loop wakeup."""
+        self.wakeups += 1
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            due, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+
+            lag = now - due
+            self.fired += 1
+            self.lag_total += lag
+            self.lag_max = max(self.lag_max, lag)
+            if self.metrics:
+                self.metrics.observe('loop_lag_ms', lag * 1000)
+
+            if timer.interval:
+                # Keep the cadence, but don't try to catch up missed periods
+                timer.due = due + timer.interval
+                if timer.due <= now:
+                    timer.due = now + timer.interval
+                self._push(timer)
+            timer.func()
+            now = time.monotonic()
+
+    def stats(self):
+        """Wakeup rate and timer lateness."""
+        minutes = max(time.monotonic() - self.started, 1e-6) / 60
+        return {
+            'wakeups': self.wakeups,
+            'wakeups_per_minute': self.wakeups / minutes,
+            'timers_fired': self.fired,
+            'lag_avg_ms': (self.lag_total / self.fired * 1000) if self.fired else 0.0,
+            'lag_max_ms': self.lag_max * 1000,
+        }
@@ -13,23 +13,39 @@ Sensors:
 Display: Adafruit Mini PiTFT 135x240 (ST7789)
 
 Uses adafruit_rgb_display (PIL-based) NOT adafruit_st7789 (displayio-based)
+
+Run with --simulate to use simulated devices instead (see hardware.py).
 """
 
 import time
-import board
-import busio
-import digitalio
+IMPORT_START = time.perf_counter()  # Startup phases are timed from here
+
+import argparse
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
 
-# Display - use RGB Display library (PIL-compatible)
-from adafruit_rgb_display import st7789
-
-# Sensors
-import adafruit_ds3231
-import adafruit_ahtx0
-import adafruit_bmp280
-import adafruit_scd4x
-import adafruit_gps
+from acquisition import AcquisitionEngine
+from alerts import AlertEngine, AlertEvent, HTTPWebhook, LocalWebhook, RateOfChange, Threshold
+from burst_read import read_aht20, read_bmp280
+from buttons import ButtonInput, LONG_PRESS, PRESS, RELEASE
+from datalog import ReadingLogger
+from exporter import LocalBroker, MQTTExporter, PahoTransport
+from frame_push import DirtyRegionPusher
+from fusion import SensorFusion
+from hardware import ADDRESSES, PiBackend, SimBackend
+from history import HistoryStore
+from metrics import Metrics, PhaseTimer, process_rss_bytes
+from network_monitor import NetworkMonitor
+from rollups import RollupStore
+from scheduler import Scheduler
+from sensor_trace import TracePlayer, TraceWriter, read_trace
+from supervisor import DEGRADED, QUARANTINED, RETRYING, Supervisor
+from text_cache import TextCache
+from web_api import LiveFeed, WebServer
 
 
 class SensorStation:
@@ -46,35 +62,144 @@ class SensorStation:
     BLUE = (0, 128, 255)
     GRAY = (128, 128, 128)
 
-    def __init__(self):
-        """Initialize display and sensors."""
-        # Initialize I2C bus
-        self.i2c = board.I2C()
-
-        # Initialize display
+    # Page chrome: (title, title bar color, title text color)
+    PAGE_TITLES = [
+        ("ENVIRONMENTAL", BLUE, WHITE),
+        ("AIR QUALITY", GREEN, BLACK),
+        ("GPS LOCATION", ORANGE, BLACK),
+        ("SYSTEM INFO", CYAN, BLACK),
+        ("PERFORMANCE", (160, 0, 255), WHITE),
+    ]
+
+    # Pages showing a clock or live stats, redrawn every second
+    CLOCK_PAGES = (3, 4)
+
+    # sensor_data fields each page shows; a page is only re-rendered when one
+    # of them (or the clock second, on CLOCK_PAGES) has changed
+    PAGE_FIELDS = [
+        ('temperature', 'humidity', 'pressure', 'altitude'),
+        ('co2', 'temperature_scd', 'humidity_scd'),
+        ('gps_fix', 'latitude', 'longitude', 'gps_altitude', 'satellites'),
+        ('datetime', 'co2'),
+        (),
+    ]
+
+    # Per-device polling cadence (seconds)
+    RTC_INTERVAL = 30.0   # Clock is extrapolated between reads
+    AHT_INTERVAL = 2.0
+    BMP_INTERVAL = 2.0
+    SCD_INTERVAL = 5.0    # SCD-41 periodic measurement cycle
+    GPS_INTERVAL = 0.25   # Drain the PA1010D NMEA buffer (fixes arrive at 1Hz)
+
+    # Offsets added to raw readings before fusion, e.g. {'temperature_bmp': -1.5}
+    CALIBRATION = {}
+
+    # Low-power mode (backlight off): no rendering or SPI, slower sensors.
+    # Cadences in seconds; devices not listed keep their normal rate.
+    LOW_POWER_INTERVALS = {'rtc': 300.0, 'aht': 15.0, 'bmp': 15.0, 'scd': 30.0, 'gps': 1.0}
+    LOW_POWER_SCD = True          # SCD-41 low-power periodic mode (one sample / 30s)
+    LOW_POWER_STALE_AFTER = 90.0  # Staleness limit while sensors are slowed down
+
+    # History: one row of fresh readings every HISTORY_INTERVAL, 24h kept
+    HISTORY_INTERVAL = 5.0
+    HISTORY_HOURS = 24
+    STALE_AFTER = 30.0    # Readings older than this are recorded as missing
+
+    # Persistent log: rows buffered in memory, written in batches
+    LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'readings.db')
+    SIM_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'readings-sim.db')
+    LOG_FLUSH_INTERVAL = 60.0  # Seconds between SD card writes
+    LOG_FSYNC = 'batch'        # 'batch', 'checkpoint' or 'off' (see datalog.py)
+
+    # Local HTTP endpoint (/metrics, /api/latest, /api/stream).
+    # Use '0.0.0.0' to serve dashboards elsewhere on the LAN.
+    HTTP_HOST = '127.0.0.1'
+    HTTP_PORT = 8080
+
+    # MQTT export: None disables it, 'local' uses the in-process stand-in broker
+    MQTT_HOST = None
+    MQTT_PORT = 1883
+    MQTT_TOPIC = 'sensor_station/readings'
+    EXPORT_OUTBOX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'outbox.db')
+
+    # Alert actions: 'local' keeps webhook payloads in memory (see /api/alerts),
+    # a URL POSTs them there, None disables the webhook
+    ALERT_WEBHOOK = 'local'
+    ALERT_FLASHES = 3       # Backlight blinks for a 'flash' action
+    ALERT_PAGE = 1          # Page shown by a 'co2_page' action
+
+    # Devices opened at startup: (attribute, name, opener method)
+    DEVICES = (
+        ('rtc', "DS3231 RTC", '_open_rtc'),
+        ('aht', "AHT20", '_open_aht'),
+        ('bmp', "BMP280", '_open_bmp'),
+        ('scd', "SCD-41", '_open_scd'),
+        ('gps', "PA1010D GPS", '_open_gps'),
+    )
+
+    # Device supervision: a device is dropped after DEVICE_MAX_ERRORS failed
+    # reads in a row and re-opened with a doubling backoff. After
+    # DEVICE_QUARANTINE_AFTER failures without a good read it is only
+    # retried every DEVICE_QUARANTINE_TIME seconds.
+    DEVICE_MAX_ERRORS = 3
+    DEVICE_BACKOFF = 2.0
+    DEVICE_MAX_BACKOFF = 300.0
+    DEVICE_QUARANTINE_AFTER = 6
+    DEVICE_QUARANTINE_TIME = 1800.0
+
+    def __init__(self, backend=None, log_path=None):
+        """Initialize display and sensors (on the Pi unless given another backend)."""
+        # Latency histograms and counters, always on
+        self.metrics = Metrics()
+        self.startup = PhaseTimer(self.metrics, IMPORT_START)
+        self.startup.mark('imports')
+
+        # Real or simulated devices
+        self.hw = backend or PiBackend()
+        self.log_path = log_path or self.LOG_PATH
+
+        # Initialize display and show something right away
         self._init_display()
+        self.startup.mark('display')
+        self._show_splash()
+        self.startup.mark('splash')
+
+        # Sensors are opened in the background while the rest is set up
+        self._init_sensors()
+        self.startup.mark('i2c_scan')
 
         # Initialize buttons
         self._init_buttons()
 
-        # Initialize sensors
-        self._init_sensors()
-
         # Display state
+        self.pages = [
+            self.draw_page_environmental,
+            self.draw_page_air_quality,
+            self.draw_page_gps,
+            self.draw_page_system,
+            self.draw_page_perf,
+        ]
         self.current_page = 0
-        self.num_pages = 4
+        self.num_pages = len(self.pages)
         self.backlight_on = True
-        self.last_button_time = 0
-        self.last_page_change = time.monotonic()
+        self.low_power = False
+        self.stale_after = self.STALE_AFTER
+        self._wake_press = None  # Button whose press woke the display
         self.page_interval = 15.0  # Auto-rotate every 15 seconds
+
+        # Main loop timers; the loop sleeps until one is due or an event arrives
+        self.scheduler = Scheduler(self.metrics)
+        self.redraw_pending = True
+
+        # Static page chrome, rendered once
+        self._build_page_layers()
+        self.startup.mark('layers')
         
-        # Network info overlay
+        # Network info overlay, kept fresh by a background monitor
         self.show_network = False
-        self.network_info = {
-            'ssid': None,
-            'ip': None,
-            'ping_ms': None,
-        }
+        self.network = NetworkMonitor(on_update=self._network_updated)
+        self.network_version = 0
+        self.network_info = self.network.info
 
         # Sensor data cache
         self.sensor_data = {
@@ -92,40 +217,152 @@ class SensorStation:
             'longitude': None,
             'gps_altitude': None,
             'satellites': None,
+            # Fused from the raw readings above (see fusion.py)
+            'temperature': None,
+            'temperature_sigma': None,
+            'humidity': None,
+            'humidity_sigma': None,
         }
+        # Monotonic time each field was last published, and a counter bumped
+        # whenever its value changes (see PAGE_FIELDS)
+        self.sensor_times = {}
+        self.field_versions = dict.fromkeys(self.sensor_data, 0)
+        self._render_key = None
+        self.renders_skipped = 0
+        self._data_lock = threading.Lock()
+
+        # Temperature / humidity fusion, updated once per new raw sample
+        self.fusion = SensorFusion(self.CALIBRATION)
+
+        # Raw readings are written here while recording a trace
+        self.recorder = None
+
+        # Local metrics and live readings API, started by run()
+        self.web = WebServer(self.HTTP_HOST, self.HTTP_PORT)
+        self.web.route('/metrics', self._metrics_text)
+        self.feed = LiveFeed(self.web)
+
+        # Recent readings for trends and rates
+        self.history = HistoryStore(capacity=int(self.HISTORY_HOURS * 3600 / self.HISTORY_INTERVAL))
+        self.web.route('/api/history', self._history_json, params=True)
+        self._init_alerts()
+        self._init_logging()
+        self._init_rollups()
+        self._init_export()
+        self.startup.mark('log')
+
+        # One worker per device, started by run()
+        self._finish_sensors()
+        self.startup.mark('sensors')
+        self._init_acquisition()
+        print(f"✓ Started in {self.startup.total_ms:.0f}ms ({self.startup.summary()})")
+
+    def _init_export(self):
+        """Set up batched MQTT export, if a broker is configured."""
+        self.exporter = None
+        if not self.MQTT_HOST:
+            return
+        try:
+            if self.MQTT_HOST == 'local':
+                transport = LocalBroker()
+            else:
+                transport = PahoTransport(self.MQTT_HOST, self.MQTT_PORT)
+            self.exporter = MQTTExporter(transport, self.EXPORT_OUTBOX, self.history.fields,
+                                         topic=self.MQTT_TOPIC, metrics=self.metrics)
+            print(f"✓ MQTT export to {self.MQTT_HOST} ({self.exporter.outbox.depth} batches queued)")
+        except Exception as e:
+            print(f"✗ MQTT export failed: {e}")
+
+    def _init_logging(self):
+        """Open the reading log and restore recent history from it."""
+        try:
+            self.logger = ReadingLogger(
+                self.log_path, self.history.fields,
+                flush_interval=self.LOG_FLUSH_INTERVAL, fsync=self.LOG_FSYNC)
+        except Exception as e:
+            print(f"✗ Reading log failed: {e}")
+            self.logger = None
+            return
+
+        rows = self.logger.rows_since(time.time() - self.HISTORY_HOURS * 3600)
+        for timestamp, values in rows:
+            self.history.append(timestamp, values)
+        print(f"✓ Reading log opened ({len(rows)} rows of history restored)")
+
+    def alert_rules(self):
+        """
+        Alert rules, evaluated as readings arrive (see alerts.py). Actions:
+        'flash' blinks the backlight, 'co2_page' shows the air quality page
+        (waking the screen), 'webhook' sends the alert to ALERT_WEBHOOK.
+        """
+        return [
+            Threshold('co2_hazardous', 'co2', above=1500, hysteresis=100, sustain=30,
+                      actions=('flash', 'co2_page', 'webhook')),
+            Threshold('co2_poor', 'co2', above=1000, hysteresis=50, window=600,  # 10 min average
+                      actions=('co2_page', 'webhook')),
+            RateOfChange('co2_rising', 'co2', window=600, rise=50, per=60,      # ppm/min
+                         hysteresis=20, sustain=60, actions=('webhook',)),
+            Threshold('temperature_high', 'temperature', above=32, hysteresis=1, sustain=300,
+                      actions=('webhook',)),
+            Threshold('humidity_low', 'humidity', below=20, hysteresis=2, sustain=600,
+                      actions=('webhook',)),
+            RateOfChange('pressure_falling', 'pressure', window=3 * 3600, fall=1.0, per=3600,  # hPa/h
+                         hysteresis=0.3, sustain=600, actions=('webhook',)),
+        ]
+
+    def _init_alerts(self):
+        """Streaming alert rules and where their webhook payloads go."""
+        self.alerts = AlertEngine(self.alert_rules(), self.metrics)
+        if self.ALERT_WEBHOOK == 'local':
+            self.webhook = LocalWebhook()
+        elif self.ALERT_WEBHOOK:
+            self.webhook = HTTPWebhook(self.ALERT_WEBHOOK)
+        else:
+            self.webhook = None
+        self.web.route('/api/alerts', self._alerts_json)
+
+    def _alerts_json(self):
+        """GET /api/alerts - rule states, recent alerts and (local stand-in) webhook payloads."""
+        body = self.alerts.snapshot()
+        if isinstance(self.webhook, LocalWebhook):
+            body['webhook'] = self.webhook.payloads()
+        return 'application/json', json.dumps(body, separators=(',', ':'), default=str).encode()
+
+    def _history_json(self, params):
+        """GET /api/history?field=co2[&since=] (epoch seconds) - raw samples of the last 24h."""
+        field = params.get('field')
+        if field not in self.history.fields:
+            raise ValueError(f"field must be one of {', '.join(self.history.fields)}")
+        since = float(params['since']) if 'since' in params else None
+        body = {'field': field, 'columns': ['time', 'value'], 'rows': self.history.series(field, since)}
+        return 'application/json', json.dumps(body, separators=(',', ':')).encode()
+
+    def _init_rollups(self):
+        """Minute / hour / day rollups, kept in the reading log's database."""
+        try:
+            self.rollups = RollupStore(self.log_path, self.history.fields,
+                                       flush_interval=self.LOG_FLUSH_INTERVAL, fsync=self.LOG_FSYNC)
+        except Exception as e:
+            print(f"✗ Rollups failed: {e}")
+            self.rollups = None
+            return
+        self.web.route('/api/rollups', self._rollups_json, params=True)
+
+    def _rollups_json(self, params):
+        """GET /api/rollups?field=temperature&resolution=hour[&since=&until=] (epoch seconds)."""
+        if 'field' not in params:
+            raise ValueError("field is required")
+        resolution = params.get('resolution', 'hour')
+        since = float(params['since']) if 'since' in params else None
+        until = float(params['until']) if 'until' in params else None
+        rows = self.rollups.query(params['field'], resolution, since, until)
+        body = {'field': params['field'], 'resolution': resolution,
+                'columns': ['start', 'min', 'max', 'mean', 'count'], 'rows': rows}
+        return 'application/json', json.dumps(body, separators=(',', ':')).encode()
 
     def _init_display(self):
         """Initialize the Mini PiTFT display using RGB Display library."""
-        # Configuration for CS and DC pins (PiTFT defaults)
-        cs_pin = digitalio.DigitalInOut(board.CE0)
-        dc_pin = digitalio.DigitalInOut(board.D25)
-        reset_pin = digitalio.DigitalInOut(board.D27)
-
-        # Backlight control
-        self.backlight = digitalio.DigitalInOut(board.D22)
-        self.backlight.switch_to_output()
-        self.backlight.value = True
-
-        # Setup SPI bus
-        spi = board.SPI()
-
-        # Baudrate - can go up to 64MHz for faster updates
-        BAUDRATE = 64000000
-
-        # Create the ST7789 display using adafruit_rgb_display
-        # For 135x240 Mini PiTFT in landscape (rotation=270)
-        self.display = st7789.ST7789(
-            spi,
-            cs=cs_pin,
-            dc=dc_pin,
-            rst=reset_pin,
-            baudrate=BAUDRATE,
-            width=135,
-            height=240,
-            x_offset=53,
-            y_offset=40,
-            rotation=270,  # Landscape orientation
-        )
+        self.display, self.backlight = self.hw.display()
 
         # Create image buffer - swap dimensions for rotation
         # In rotation=270, width becomes height and vice versa
@@ -136,7 +373,10 @@ class SensorStation:
             self.width = self.display.width
             self.height = self.display.height
 
-        self.image = Image.new("RGB", (self.width, self.height))
+        # Frames are drawn straight into the pusher's buffer; only changed
+        # regions of each frame go over SPI
+        self.pusher = DirtyRegionPusher(self.display, self.width, self.height)
+        self.image = self.pusher.frame
         self.draw = ImageDraw.Draw(self.image)
 
         # Load fonts
@@ -150,178 +390,334 @@ class SensorStation:
             self.font_medium = ImageFont.load_default()
             self.font_small = ImageFont.load_default()
 
-    def _init_buttons(self):
-        """Initialize Mini PiTFT buttons."""
-        # Button A - GPIO 23
-        self.button_a = digitalio.DigitalInOut(board.D23)
-        self.button_a.direction = digitalio.Direction.INPUT
-        self.button_a.pull = digitalio.Pull.UP
-
-        # Button B - GPIO 24
-        self.button_b = digitalio.DigitalInOut(board.D24)
-        self.button_b.direction = digitalio.Direction.INPUT
-        self.button_b.pull = digitalio.Pull.UP
+        # Rendered text runs and digit glyphs, reused across frames
+        self.text_cache = TextCache()
 
-    def _init_sensors(self):
-        """Initialize all sensors."""
-        # DS3231 RTC
-        try:
-            self.rtc = adafruit_ds3231.DS3231(self.i2c)
-            print("✓ DS3231 RTC initialized")
-        except Exception as e:
-            print(f"✗ DS3231 RTC failed: {e}")
-            self.rtc = None
-
-        # AHT20 Temperature & Humidity
-        try:
-            self.aht = adafruit_ahtx0.AHTx0(self.i2c)
-            print("✓ AHT20 initialized")
-        except Exception as e:
-            print(f"✗ AHT20 failed: {e}")
-            self.aht = None
+    def _show_splash(self):
+        """Put a title on the screen while everything else starts."""
+        self.draw.rectangle((0, 0, self.width, self.height), fill=self.BLACK)
+        self.draw.text((10, 40), "SENSOR STATION", font=self.font_large, fill=self.CYAN)
+        self.draw.text((10, 80), "Starting...", font=self.font_medium, fill=self.GRAY)
+        self.pusher.push()
 
-        # BMP280 Pressure & Altitude
-        try:
-            self.bmp = adafruit_bmp280.Adafruit_BMP280_I2C(self.i2c)
-            # Set sea level pressure for altitude calculation
-            # Fort Worth area is typically around 1015-1020 hPa
-            self.bmp.sea_level_pressure = 1013.25  # Adjust for your location
-            print("✓ BMP280 initialized")
-        except Exception as e:
-            print(f"✗ BMP280 failed: {e}")
-            self.bmp = None
+    def _init_buttons(self):
+        """Initialize Mini PiTFT buttons as an edge-driven event queue."""
+        self.events = queue.Queue()
+        self.buttons = ButtonInput(self.events)
 
-        # SCD-41 CO2 Sensor
-        try:
-            self.scd = adafruit_scd4x.SCD4X(self.i2c)
-            self.scd.start_periodic_measurement()
-            print("✓ SCD-41 initialized (waiting for first measurement...)")
-        except Exception as e:
-            print(f"✗ SCD-41 failed: {e}")
-            self.scd = None
+        self.hw.attach_buttons(self.buttons)
 
-        # PA1010D GPS
+    def _init_sensors(self):
+        """Start opening every device found by one I2C scan, all in parallel."""
         try:
-            self.gps = adafruit_gps.GPS_GtopI2C(self.i2c)
-            # Turn on basic GGA and RMC sentences
-            self.gps.send_command(b"PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0")
-            # Set update rate to 1Hz
-            self.gps.send_command(b"PMTK220,1000")
-            print("✓ PA1010D GPS initialized")
+            found = self.hw.scan()
         except Exception as e:
-            print(f"✗ PA1010D GPS failed: {e}")
-            self.gps = None
-
-    def read_sensors(self):
-        """Read all sensor values."""
-        # RTC
-        if self.rtc:
+            print(f"✗ I2C scan failed: {e}")
+            found = set(ADDRESSES.values())  # Let each device try anyway
+        self.gps_reader = None
+        self.supervisor = Supervisor(
+            self._device_changed, self.metrics, self.DEVICE_MAX_ERRORS, self.DEVICE_BACKOFF,
+            self.DEVICE_MAX_BACKOFF, self.DEVICE_QUARANTINE_AFTER, self.DEVICE_QUARANTINE_TIME)
+        self._device_futures = {}
+        self._device_pool = ThreadPoolExecutor(len(self.DEVICES), thread_name_prefix="init")
+        for name, label, opener in self.DEVICES:
+            setattr(self, name, None)
+            if ADDRESSES[name] not in found:
+                print(f"✗ {label} not found at 0x{ADDRESSES[name]:02X}")
+                continue
+            self._device_futures[name] = self._device_pool.submit(self._open_device, getattr(self, opener))
+
+    def _open_device(self, opener):
+        """Run one opener on an init thread, timing it."""
+        start = time.perf_counter()
+        device = opener()
+        return device, (time.perf_counter() - start) * 1000
+
+    def _finish_sensors(self):
+        """Wait for the devices started by _init_sensors(); supervise all of them."""
+        for name, label, opener in self.DEVICES:
+            future = self._device_futures.get(name)
+            if future is None:
+                # Not on the bus now; picked up if it is plugged in later
+                self.supervisor.add(name, getattr(self, opener), opened=False, error="not found")
+                continue
             try:
-                self.sensor_data['datetime'] = self.rtc.datetime
-            except Exception:
-                pass
+                device, ms = future.result()
+            except Exception as e:
+                print(f"✗ {label} failed: {e}")
+                self.supervisor.add(name, getattr(self, opener), opened=False, error=str(e))
+                continue
+            self.supervisor.add(name, getattr(self, opener))
+            setattr(self, name, device)
+            self.metrics.set('startup_device_ms', round(ms, 1), device=name)
+            print(f"✓ {label} initialized ({ms:.0f}ms)")
+        self._device_pool.shutdown()
+        if self.scd:
+            print("  SCD-41 first measurement in ~5s")
+
+    def _open_rtc(self):
+        return self.hw.rtc()
+
+    def _open_aht(self):
+        return self.hw.aht()
+
+    def _open_bmp(self):
+        bmp = self.hw.bmp()
+        # Set sea level pressure for altitude calculation
+        # Fort Worth area is typically around 1015-1020 hPa
+        bmp.sea_level_pressure = 1013.25  # Adjust for your location
+        return bmp
+
+    def _open_scd(self):
+        scd = self.hw.scd()
+        scd.start_periodic_measurement()
+        return scd
+
+    def _open_gps(self):
+        gps = self.hw.gps()
+        # Turn on basic GGA and RMC sentences
+        gps.send_command(b"PMTK314,0,1,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0")
+        # Set update rate to 1Hz
+        gps.send_command(b"PMTK220,1000")
+        # Sentences are read and parsed by our own bulk reader from here on
+        self.gps_reader = self.hw.gps_reader()
+        return gps
+
+    def _device_changed(self, name, device):
+        """Supervisor callback (worker thread): a device was dropped or re-opened."""
+        if name == 'scd' and device:
+            self.scd_low_power = False  # _open_scd() starts normal periodic mode
+        setattr(self, name, device)
+        self.request_redraw()
+
+    def _init_acquisition(self):
+        """Give each device its own worker and cadence."""
+        # Every device gets a worker, even if it is missing: the supervisor
+        # keeps it away from the bus until the device can be opened
+        self.acquisition = AcquisitionEngine(self.publish, self.metrics, self.supervisor)
+        self.acquisition.add('rtc', self._read_rtc, self.RTC_INTERVAL)
+        self.acquisition.add('aht', self._read_aht, self.AHT_INTERVAL)
+        self.acquisition.add('bmp', self._read_bmp, self.BMP_INTERVAL)
+        # SCD-41 produces a sample every 5s; poll faster until it is ready
+        self.acquisition.add('scd', self._read_scd, self.SCD_INTERVAL, retry_interval=0.5)
+        self.scd_low_power = False   # Mode the sensor is in
+        self.scd_want_low = False    # Mode requested, applied by the SCD worker
+        self.acquisition.add('gps', self._read_gps, self.GPS_INTERVAL)
+
+    def publish(self, values, now=None):
+        """Store new readings (and anything fused from them) with a monotonic timestamp."""
+        start = time.perf_counter()
+        if now is None:
+            now = time.monotonic()
+        if self.recorder:
+            self.recorder.write(values)
+        changed = False
+        with self._data_lock:
+            values = dict(values, **self.fusion.update(values, now))
+            # O(1) per reading; actions run on the main loop
+            alerts = self.alerts.evaluate(values, now)
+            for key, value in values.items():
+                if self.sensor_data.get(key) != value:
+                    self.field_versions[key] = self.field_versions.get(key, 0) + 1
+                    changed = True
+                self.sensor_times[key] = now
+            self.sensor_data.update(values)
+            # Serialized once here, shared by every API client
+            self.feed.update(self.sensor_data)
+        self.metrics.observe('publish_ms', (time.perf_counter() - start) * 1000)
+        for alert in alerts:
+            self.events.put(alert)
+        if changed:
+            self.request_redraw()
+
+    def fresh_readings(self, now=None):
+        """Copy of sensor_data without fields not updated within the staleness limit."""
+        if now is None:
+            now = time.monotonic()
+        limit = self.stale_after
+        with self._data_lock:
+            return {
+                key: value for key, value in self.sensor_data.items()
+                if now - self.sensor_times.get(key, -limit) < limit
+            }
+
+    def _record_sample(self, timestamp=None, now=None):
+        """Sample timer: add one row of fresh readings to history and the log."""
+        if timestamp is None:
+            timestamp = time.time()
+        readings = self.fresh_readings(now)
+        self.history.append(timestamp, readings)
+        if self.logger:
+            self.logger.record(timestamp, readings)
+        if self.rollups:
+            self.rollups.add(timestamp, readings)
+        if self.exporter:
+            self.exporter.submit(timestamp, readings)
+
+    def request_redraw(self):
+        """Mark the display dirty and wake the main loop (any thread)."""
+        if self.low_power:
+            return  # Screen is dark; resuming redraws everything anyway
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.events.put(None)
+
+    def _read_rtc(self):
+        """Read the DS3231 clock."""
+        return {'datetime': self.rtc.datetime}
+
+    def _read_aht(self):
+        """Read AHT20 temperature and humidity (one measurement)."""
+        return read_aht20(self.aht)
+
+    def _read_bmp(self):
+        """Read BMP280 temperature, pressure and altitude (one measurement)."""
+        return read_bmp280(self.bmp)
+
+    def _read_scd(self):
+        """Read SCD-41 CO2, or None if no new measurement is ready."""
+        if self.scd_want_low != self.scd_low_power:
+            # Mode switches run here so they never race a read (stop takes 500ms)
+            self.scd.stop_periodic_measurement()
+            if self.scd_want_low:
+                self.scd.start_low_periodic_measurement()
+            else:
+                self.scd.start_periodic_measurement()
+            self.scd_low_power = self.scd_want_low
+            return None
+        if not self.scd.data_ready:
+            return None
+        return {
+            'co2': self.scd.CO2,
+            'temperature_scd': self.scd.temperature,
+            'humidity_scd': self.scd.relative_humidity,
+        }
 
-        # AHT20
-        if self.aht:
-            try:
-                self.sensor_data['temperature_aht'] = self.aht.temperature
-                self.sensor_data['humidity_aht'] = self.aht.relative_humidity
-            except Exception:
-                pass
+    def _read_gps(self):
+        """Drain buffered NMEA; fix updates from every GGA/RMC, or None."""
+        return self.gps_reader.drain()
 
-        # BMP280
-        if self.bmp:
-            try:
-                self.sensor_data['temperature_bmp'] = self.bmp.temperature
-                self.sensor_data['pressure'] = self.bmp.pressure
-                self.sensor_data['altitude'] = self.bmp.altitude
-            except Exception:
-                pass
+    def read_sensors(self):
+        """Read all sensor values once, in the calling thread."""
+        # Same path as the workers, so errors are counted and reported to the supervisor
+        for worker in self.acquisition.workers.values():
+            worker.read_once()
 
-        # SCD-41 (CO2) - check if data is ready
-        if self.scd:
-            try:
-                if self.scd.data_ready:
-                    self.sensor_data['co2'] = self.scd.CO2
-                    self.sensor_data['temperature_scd'] = self.scd.temperature
-                    self.sensor_data['humidity_scd'] = self.scd.relative_humidity
-            except Exception:
-                pass
-
-        # GPS
-        if self.gps:
+    def check_buttons(self, timeout=0):
+        """Handle queued events, waiting up to timeout (None: forever) for the first."""
+        try:
+            if timeout is None or timeout > 0:
+                event = self.events.get(timeout=timeout)
+            else:
+                event = self.events.get_nowait()
+        except queue.Empty:
+            return
+        while True:
+            if isinstance(event, AlertEvent):
+                self.handle_alert(event)
+            elif event is not None:  # None just wakes the loop
+                self.handle_button(event)
             try:
-                self.gps.update()
-                if self.gps.has_fix:
-                    self.sensor_data['gps_fix'] = True
-                    self.sensor_data['latitude'] = self.gps.latitude
-                    self.sensor_data['longitude'] = self.gps.longitude
-                    self.sensor_data['gps_altitude'] = self.gps.altitude_m
-                    self.sensor_data['satellites'] = self.gps.satellites
-                else:
-                    self.sensor_data['gps_fix'] = False
-            except Exception:
-                pass
-
-    def check_buttons(self):
-        """Check button states and handle actions."""
-        current_time = time.monotonic()
-
-        # Debounce - 300ms
-        if current_time - self.last_button_time < 0.3:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def handle_button(self, event):
+        """Act on a button event (taps act on release, holds on long-press)."""
+        # While dark, any press wakes the display; the rest of that press is ignored
+        if self.low_power and event.kind == PRESS:
+            self._wake_press = event.button
+            self.set_backlight(True)
+            return
+        if event.button == self._wake_press:
+            if event.kind == RELEASE:
+                self._wake_press = None
             return
 
-        # Button A - toggle backlight
-        if not self.button_a.value:
-            self.backlight_on = not self.backlight_on
-            self.backlight.value = self.backlight_on
-            self.last_button_time = current_time
-
-        # Button B - toggle network info with ping
-        if not self.button_b.value:
-            if self.show_network:
-                self.show_network = False
-            else:
-                self.show_network = True
-                self.update_network_info()
-            self.last_button_time = current_time
+        tap = event.kind == RELEASE and event.duration < self.buttons.long_press
+        self.request_redraw()
+
+        # Button A - tap toggles backlight, hold skips to the next page
+        if event.button == 'A':
+            if tap:
+                self.set_backlight(not self.backlight_on)
+            elif event.kind == LONG_PRESS:
+                self.set_backlight(True)
+                self.next_page()
+
+        # Button B - tap toggles network info (shows cached values immediately)
+        elif event.button == 'B':
+            if tap:
+                self.show_network = not self.show_network
+                self.network.set_active(self.show_network)
+
+    def handle_alert(self, event):
+        """Run an alert's actions (main loop)."""
+        value = f"{event.value:.1f}" if isinstance(event.value, float) else event.value
+        if not event.active:
+            print(f"✓ Alert cleared: {event.rule} ({event.field} {value})")
+            if 'webhook' in event.actions and self.webhook:
+                self.webhook.send(event.payload())
+            self.request_redraw()
+            return
+        print(f"✗ Alert: {event.rule} ({event.field} {value})")
+        for action in event.actions:
+            if action == 'flash':
+                self.flash_backlight()
+            elif action == 'co2_page':
+                self.show_page(self.ALERT_PAGE)
+            elif action == 'webhook' and self.webhook:
+                self.webhook.send(event.payload())
+        self.request_redraw()
+
+    def flash_backlight(self):
+        """Blink the backlight ALERT_FLASHES times, ending in its normal state."""
+        for step in range(self.ALERT_FLASHES * 2):
+            # Inverted on even steps; reads backlight_on when it runs, so a tap mid-flash wins
+            self.scheduler.once(0.25 * step, lambda invert=(step % 2 == 0):
+                                setattr(self.backlight, 'value', self.backlight_on != invert),
+                                name='flash_backlight')
+
+    def set_backlight(self, on):
+        """Switch the backlight, entering low-power mode while it is off."""
+        self.backlight_on = on
+        self.backlight.value = on
+        self.set_low_power(not on)
+
+    def set_low_power(self, enabled):
+        """Stop rendering and slow the sensors down, or return to full rate."""
+        if enabled == self.low_power:
+            return
+        self.low_power = enabled
+        self.metrics.set('low_power', int(enabled))
 
-    def update_network_info(self):
-        """Get network info and ping 1.1.1.1"""
-        import subprocess
-        
-        # Get SSID
-        try:
-            result = subprocess.run(['iwgetid', '-r'], capture_output=True, text=True, timeout=5)
-            self.network_info['ssid'] = result.stdout.strip() or "Not connected"
-        except Exception:
-            self.network_info['ssid'] = "Unknown"
-        
-        # Get IP address
-        try:
-            result = subprocess.run(['hostname', '-I'], capture_output=True, text=True, timeout=5)
-            ips = result.stdout.strip().split()
-            self.network_info['ip'] = ips[0] if ips else "No IP"
-        except Exception:
-            self.network_info['ip'] = "Unknown"
-        
-        # Ping 1.1.1.1
-        try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '2', '1.1.1.1'],
-                capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                # Parse ping time from output
-                for line in result.stdout.split('\n'):
-                    if 'time=' in line:
-                        ping_time = line.split('time=')[1].split()[0]
-                        self.network_info['ping_ms'] = ping_time
-                        break
-            else:
-                self.network_info['ping_ms'] = "FAIL"
-        except Exception:
-            self.network_info['ping_ms'] = "ERROR"
+        # Display timers only exist to keep the screen current
+        if enabled:
+            self.scheduler.cancel(self.page_timer)
+            self.scheduler.cancel(self.clock_timer)
+        else:
+            self.page_timer = self.scheduler.reschedule(self.page_timer, self.page_interval)
+            self.clock_timer = self.scheduler.every(1.0, self._clock_tick, delay=1.0 - time.time() % 1.0)
+
+        for name, worker in self.acquisition.workers.items():
+            if enabled and name in self.LOW_POWER_INTERVALS:
+                interval = self.LOW_POWER_INTERVALS[name]
+                worker.set_interval(interval, min(worker.normal_retry_interval * 4, interval))
+            elif not enabled:
+                worker.set_interval(worker.normal_interval, worker.normal_retry_interval)
+        if self.LOW_POWER_SCD:
+            self.scd_want_low = enabled
+        self.stale_after = self.LOW_POWER_STALE_AFTER if enabled else self.STALE_AFTER
+        self.network.set_active(self.show_network and not enabled)
+        self.buttons.set_low_power(enabled)
+
+        # The panel kept the last frame, so a normal redraw is all resuming needs
+        self.request_redraw()
+
+    def _network_updated(self):
+        """Network monitor callback: new SSID / IP / ping for the overlay."""
+        self.network_version += 1
+        self.request_redraw()
 
     def draw_network_overlay(self):
         """Draw network info overlay."""
@@ -329,298 +725,564 @@ class SensorStation:
         self.draw.rectangle((10, 25, self.width - 10, self.height - 10), fill=(20, 20, 40), outline=self.CYAN)
         
         y = 35
-        self.draw.text((20, y), "NETWORK INFO", font=self.font_medium, fill=self.CYAN)
+        self.draw_text((20, y), "NETWORK INFO", font=self.font_medium, fill=self.CYAN)
         y += 25
         
-        self.draw.text((20, y), f"SSID: {self.network_info['ssid']}", font=self.font_small, fill=self.WHITE)
+        ssid_text = f"SSID: {self.network_info['ssid'] or '...'}"
+        if self.network_info['signal_dbm'] is not None:
+            ssid_text += f" ({self.network_info['signal_dbm']} dBm)"
+        self.draw_text((20, y), ssid_text, font=self.font_small, fill=self.WHITE)
         y += 18
         
-        self.draw.text((20, y), f"IP: {self.network_info['ip']}", font=self.font_small, fill=self.WHITE)
+        self.draw_text((20, y), f"IP: {self.network_info['ip'] or '...'}", font=self.font_small, fill=self.WHITE)
         y += 18
         
         ping = self.network_info['ping_ms']
-        if ping and ping not in ('FAIL', 'ERROR'):
+        if ping is None:
+            color = self.GRAY
+            ping_text = "Ping: ..."
+        elif ping not in ('FAIL', 'ERROR'):
             color = self.GREEN
             ping_text = f"Ping: {ping}"
         else:
             color = self.RED
             ping_text = f"Ping: {ping}"
-        self.draw.text((20, y), ping_text, font=self.font_small, fill=color)
+        self.draw_text((20, y), ping_text, font=self.font_small, fill=color)
         y += 22
         
-        self.draw.text((20, y), "[Press B to close]", font=self.font_small, fill=self.GRAY)
+        self.draw_text((20, y), "[Press B to close]", font=self.font_small, fill=self.GRAY)
+
+    def _build_page_layers(self):
+        """Pre-render the static chrome of every page (and page variant) once."""
+        self.page_layers = {}
+        self.label_xy = {}
+        self.value_xy = {}
+
+        # Environmental (labels take their value's color, drawn with it)
+        layer, draw = self._new_layer(0)
+        self._label(draw, (5, 28), "Temp: ", self.font_medium)
+        self._label(draw, (5, 50), "Humidity: ", self.font_medium)
+        self._label(draw, (5, 72), "Pressure: ", self.font_medium)
+        self._label(draw, (5, 94), "Alt: ", self.font_medium)
+        self.page_layers[(0, None)] = layer
+
+        # Air quality - with data / waiting for first measurement
+        layer, draw = self._new_layer(1)
+        draw.text((140, 45), "ppm", font=self.font_medium, fill=self.WHITE)
+        self._label(draw, (5, 105), "T:", self.font_small)
+        self._label(draw, (100, 105), "H:", self.font_small)
+        self.page_layers[(1, 'data')] = layer
+
+        layer, draw = self._new_layer(1)
+        draw.text((50, 50), "Waiting for", font=self.font_medium, fill=self.YELLOW)
+        draw.text((50, 75), "CO2 data...", font=self.font_medium, fill=self.YELLOW)
+        self.page_layers[(1, 'waiting')] = layer
+
+        # GPS - fix / no fix
+        layer, draw = self._new_layer(2)
+        draw.text((180, 2), "● FIX", font=self.font_small, fill=self.GREEN)
+        self._label(draw, (5, 28), "Lat: ", self.font_medium, self.WHITE)
+        self._label(draw, (5, 50), "Lon: ", self.font_medium, self.WHITE)
+        self._label(draw, (5, 72), "GPS Alt: ", self.font_medium)
+        self._label(draw, (5, 94), "Satellites: ", self.font_medium)
+        self.page_layers[(2, 'fix')] = layer
+
+        layer, draw = self._new_layer(2)
+        draw.text((180, 2), "● NO FIX", font=self.font_small, fill=self.RED)
+        draw.text((40, 50), "Searching for", font=self.font_medium, fill=self.YELLOW)
+        draw.text((40, 75), "GPS signal...", font=self.font_medium, fill=self.YELLOW)
+        self.page_layers[(2, 'nofix')] = layer
+
+        # System
+        layer, draw = self._new_layer(3)
+        self._label(draw, (5, 25), "RTC:  ", self.font_medium)
+        self._label(draw, (5, 45), "RPi:  ", self.font_medium, self.CYAN)
+        self._label(draw, (5, 65), "Drift: ", self.font_small)
+        self._label(draw, (5, 83), "Date: ", self.font_small)
+        draw.text((5, 101), "Sensors: ", font=self.font_small, fill=self.GRAY)
+        self.page_layers[(3, None)] = layer
+
+        # Performance
+        layer, draw = self._new_layer(4)
+        self._label(draw, (5, 24), "I2C ms: ", self.font_small, self.GRAY)
+        self._label(draw, (5, 53), "Render: ", self.font_small, self.GRAY)
+        self._label(draw, (5, 68), "SPI push: ", self.font_small, self.GRAY)
+        self._label(draw, (5, 83), "Loop lag: ", self.font_small, self.GRAY)
+        self._label(draw, (5, 98), "Wake: ", self.font_small, self.GRAY)
+        self.page_layers[(4, None)] = layer
+
+    def _new_layer(self, page):
+        """Background, title bar, title and page indicator for a page."""
+        title, bar_color, text_color = self.PAGE_TITLES[page]
+        layer = Image.new("RGBX", (self.width, self.height), self.BLACK)  # Same mode as the frame
+        draw = ImageDraw.Draw(layer)
+        draw.rectangle((0, 0, self.width, 20), fill=bar_color)
+        draw.text((5, 2), title, font=self.font_small, fill=text_color)
+        draw.text((self.width - 25, self.height - 15), f"{page + 1}/{self.num_pages}",
+                  font=self.font_small, fill=self.GRAY)
+        return layer, draw
+
+    def _label(self, draw, xy, text, font, fill=None):
+        """
+        Remember where a label and its value go. Labels with a fixed color
+        are drawn into the layer; the rest are drawn with their value.
+        """
+        if fill is not None:
+            draw.text(xy, text, font=font, fill=fill)
+        self.label_xy[text] = xy
+        self.value_xy[text] = (xy[0] + round(draw.textlength(text, font=font)), xy[1])
+
+    def draw_text(self, xy, text, font, fill):
+        """Draw dynamic text through the text run / glyph cache."""
+        self.text_cache.draw(self.image, xy, text, font, fill)
+
+    def draw_field(self, label, value, font, fill):
+        """Draw a label that isn't in the page layer, and its value, in one color."""
+        self.draw_text(self.label_xy[label], label, font=font, fill=fill)
+        self.draw_text(self.value_xy[label], value, font=font, fill=fill)
+
+    def _paste_layer(self, page, variant=None):
+        """Start a frame from the page's pre-rendered chrome in one blit."""
+        self.image.paste(self.page_layers[(page, variant)])
 
     def draw_page_environmental(self):
         """Draw environmental data page (temp, humidity, pressure)."""
-        self.draw.rectangle((0, 0, self.width, self.height), fill=self.BLACK)
-
-        # Title bar
-        self.draw.rectangle((0, 0, self.width, 20), fill=self.BLUE)
-        self.draw.text((5, 2), "ENVIRONMENTAL", font=self.font_small, fill=self.WHITE)
-
-        y = 28
+        self._paste_layer(0)
 
-        # Temperature (average of AHT and BMP)
-        temps = []
-        if self.sensor_data['temperature_aht']:
-            temps.append(self.sensor_data['temperature_aht'])
-        if self.sensor_data['temperature_bmp']:
-            temps.append(self.sensor_data['temperature_bmp'])
-
-        if temps:
-            avg_temp_c = sum(temps) / len(temps)
-            avg_temp_f = (avg_temp_c * 9/5) + 32
-            self.draw.text((5, y), f"Temp: {avg_temp_c:.1f}°C / {avg_temp_f:.1f}°F", font=self.font_medium, fill=self.CYAN)
+        # Temperature (fused from AHT, BMP and SCD)
+        if self.sensor_data['temperature'] is not None:
+            temp_c = self.sensor_data['temperature']
+            temp_f = (temp_c * 9/5) + 32
+            self.draw_field("Temp: ", f"{temp_c:.1f}°C / {temp_f:.1f}°F", font=self.font_medium, fill=self.CYAN)
         else:
-            self.draw.text((5, y), "Temp: --", font=self.font_medium, fill=self.GRAY)
-        y += 22
+            self.draw_field("Temp: ", "--", font=self.font_medium, fill=self.GRAY)
 
-        # Humidity
-        if self.sensor_data['humidity_aht']:
-            hum = self.sensor_data['humidity_aht']
+        # Humidity (fused from AHT and SCD)
+        if self.sensor_data['humidity'] is not None:
+            hum = self.sensor_data['humidity']
             color = self.GREEN if 30 <= hum <= 60 else self.YELLOW
-            self.draw.text((5, y), f"Humidity: {hum:.1f}%", font=self.font_medium, fill=color)
+            self.draw_field("Humidity: ", f"{hum:.1f}%", font=self.font_medium, fill=color)
         else:
-            self.draw.text((5, y), "Humidity: --", font=self.font_medium, fill=self.GRAY)
-        y += 22
+            self.draw_field("Humidity: ", "--", font=self.font_medium, fill=self.GRAY)
 
         # Pressure
         if self.sensor_data['pressure']:
             press = self.sensor_data['pressure']
-            self.draw.text((5, y), f"Pressure: {press:.1f} hPa", font=self.font_medium, fill=self.WHITE)
+            self.draw_field("Pressure: ", f"{press:.1f} hPa", font=self.font_medium, fill=self.WHITE)
         else:
-            self.draw.text((5, y), "Pressure: --", font=self.font_medium, fill=self.GRAY)
-        y += 22
+            self.draw_field("Pressure: ", "--", font=self.font_medium, fill=self.GRAY)
 
         # Altitude
         if self.sensor_data['altitude']:
             alt_m = self.sensor_data['altitude']
             alt_ft = alt_m * 3.28084
-            self.draw.text((5, y), f"Alt: {alt_m:.0f}m / {alt_ft:.0f}ft", font=self.font_medium, fill=self.WHITE)
-
-        # Page indicator
-        self.draw.text((self.width - 25, self.height - 15), "1/4", font=self.font_small, fill=self.GRAY)
+            self.draw_field("Alt: ", f"{alt_m:.0f}m / {alt_ft:.0f}ft", font=self.font_medium, fill=self.WHITE)
 
     def draw_page_air_quality(self):
         """Draw air quality page (CO2)."""
-        self.draw.rectangle((0, 0, self.width, self.height), fill=self.BLACK)
+        if not self.sensor_data['co2']:
+            self._paste_layer(1, 'waiting')
+            return
 
-        # Title bar
-        self.draw.rectangle((0, 0, self.width, 20), fill=self.GREEN)
-        self.draw.text((5, 2), "AIR QUALITY", font=self.font_small, fill=self.BLACK)
-
-        if self.sensor_data['co2']:
-            co2 = self.sensor_data['co2']
-
-            # Determine CO2 level and color
-            if co2 < 800:
-                status = "GOOD"
-                color = self.GREEN
-            elif co2 < 1000:
-                status = "MODERATE"
-                color = self.YELLOW
-            elif co2 < 1500:
-                status = "POOR"
-                color = self.ORANGE
-            else:
-                status = "HAZARDOUS"
-                color = self.RED
-
-            # Large CO2 value
-            self.draw.text((40, 35), f"{co2}", font=self.font_large, fill=color)
-            self.draw.text((140, 45), "ppm", font=self.font_medium, fill=self.WHITE)
-
-            # Status
-            self.draw.rectangle((5, 75, self.width - 5, 95), outline=color, width=2)
-            self.draw.text((80, 77), status, font=self.font_medium, fill=color)
-
-            # SCD temperature and humidity
-            y = 105
-            if self.sensor_data['temperature_scd']:
-                temp_c = self.sensor_data['temperature_scd']
-                self.draw.text((5, y), f"T:{temp_c:.1f}°C", font=self.font_small, fill=self.GRAY)
-            if self.sensor_data['humidity_scd']:
-                hum = self.sensor_data['humidity_scd']
-                self.draw.text((100, y), f"H:{hum:.0f}%", font=self.font_small, fill=self.GRAY)
+        self._paste_layer(1, 'data')
+        co2 = self.sensor_data['co2']
+
+        # Any CO2 alert rule active
+        if self.alerts.active('co2'):
+            self.draw.rectangle((self.width - 70, 0, self.width, 20), fill=self.RED)
+            self.draw_text((self.width - 62, 2), "● ALERT", font=self.font_small, fill=self.WHITE)
+
+        # Determine CO2 level and color
+        if co2 < 800:
+            status = "GOOD"
+            color = self.GREEN
+        elif co2 < 1000:
+            status = "MODERATE"
+            color = self.YELLOW
+        elif co2 < 1500:
+            status = "POOR"
+            color = self.ORANGE
         else:
-            self.draw.text((50, 50), "Waiting for", font=self.font_medium, fill=self.YELLOW)
-            self.draw.text((50, 75), "CO2 data...", font=self.font_medium, fill=self.YELLOW)
+            status = "HAZARDOUS"
+            color = self.RED
+
+        # Large CO2 value
+        self.draw_text((40, 35), f"{co2}", font=self.font_large, fill=color)
+
+        # Status
+        self.draw.rectangle((5, 75, self.width - 5, 95), outline=color, width=2)
+        self.draw_text((80, 77), status, font=self.font_medium, fill=color)
 
-        # Page indicator
-        self.draw.text((self.width - 25, self.height - 15), "2/4", font=self.font_small, fill=self.GRAY)
+        # SCD temperature and humidity
+        if self.sensor_data['temperature_scd']:
+            temp_c = self.sensor_data['temperature_scd']
+            self.draw_field("T:", f"{temp_c:.1f}°C", font=self.font_small, fill=self.GRAY)
+        if self.sensor_data['humidity_scd']:
+            hum = self.sensor_data['humidity_scd']
+            self.draw_field("H:", f"{hum:.0f}%", font=self.font_small, fill=self.GRAY)
 
     def draw_page_gps(self):
         """Draw GPS page."""
-        self.draw.rectangle((0, 0, self.width, self.height), fill=self.BLACK)
+        if not self.sensor_data['gps_fix']:
+            self._paste_layer(2, 'nofix')
+            return
 
-        # Title bar
-        self.draw.rectangle((0, 0, self.width, 20), fill=self.ORANGE)
-        self.draw.text((5, 2), "GPS LOCATION", font=self.font_small, fill=self.BLACK)
-
-        y = 28
-
-        if self.sensor_data['gps_fix']:
-            # Fix indicator
-            self.draw.text((180, 2), "● FIX", font=self.font_small, fill=self.GREEN)
-
-            # Latitude
-            lat = self.sensor_data['latitude']
-            lat_dir = "N" if lat >= 0 else "S"
-            self.draw.text((5, y), f"Lat: {abs(lat):.6f}° {lat_dir}", font=self.font_medium, fill=self.WHITE)
-            y += 22
-
-            # Longitude
-            lon = self.sensor_data['longitude']
-            lon_dir = "E" if lon >= 0 else "W"
-            self.draw.text((5, y), f"Lon: {abs(lon):.6f}° {lon_dir}", font=self.font_medium, fill=self.WHITE)
-            y += 22
-
-            # GPS Altitude
-            if self.sensor_data['gps_altitude']:
-                alt = self.sensor_data['gps_altitude']
-                self.draw.text((5, y), f"GPS Alt: {alt:.1f}m", font=self.font_medium, fill=self.CYAN)
-            y += 22
-
-            # Satellites
-            if self.sensor_data['satellites']:
-                sats = self.sensor_data['satellites']
-                self.draw.text((5, y), f"Satellites: {sats}", font=self.font_medium, fill=self.GREEN)
-        else:
-            self.draw.text((180, 2), "● NO FIX", font=self.font_small, fill=self.RED)
-            self.draw.text((40, 50), "Searching for", font=self.font_medium, fill=self.YELLOW)
-            self.draw.text((40, 75), "GPS signal...", font=self.font_medium, fill=self.YELLOW)
+        self._paste_layer(2, 'fix')
 
-        # Page indicator
-        self.draw.text((self.width - 25, self.height - 15), "3/4", font=self.font_small, fill=self.GRAY)
+        # Latitude
+        lat = self.sensor_data['latitude']
+        lat_dir = "N" if lat >= 0 else "S"
+        self.draw_text(self.value_xy["Lat: "], f"{abs(lat):.6f}° {lat_dir}", font=self.font_medium, fill=self.WHITE)
 
-    def draw_page_system(self):
-        """Draw system info page."""
-        self.draw.rectangle((0, 0, self.width, self.height), fill=self.BLACK)
+        # Longitude
+        lon = self.sensor_data['longitude']
+        lon_dir = "E" if lon >= 0 else "W"
+        self.draw_text(self.value_xy["Lon: "], f"{abs(lon):.6f}° {lon_dir}", font=self.font_medium, fill=self.WHITE)
+
+        # GPS Altitude
+        if self.sensor_data['gps_altitude']:
+            alt = self.sensor_data['gps_altitude']
+            self.draw_field("GPS Alt: ", f"{alt:.1f}m", font=self.font_medium, fill=self.CYAN)
 
-        # Title bar
-        self.draw.rectangle((0, 0, self.width, 20), fill=self.CYAN)
-        self.draw.text((5, 2), "SYSTEM INFO", font=self.font_small, fill=self.BLACK)
+        # Satellites
+        if self.sensor_data['satellites']:
+            sats = self.sensor_data['satellites']
+            self.draw_field("Satellites: ", f"{sats}", font=self.font_medium, fill=self.GREEN)
 
-        y = 25
+    def draw_page_system(self):
+        """Draw system info page."""
+        self._paste_layer(3)
 
-        # RTC Time
+        # RTC Time (read every RTC_INTERVAL, advanced locally in between)
         if self.sensor_data['datetime']:
-            dt = self.sensor_data['datetime']
+            dt = self._rtc_now()
             rtc_time = f"{dt.tm_hour:02d}:{dt.tm_min:02d}:{dt.tm_sec:02d}"
             rtc_date = f"{dt.tm_year}-{dt.tm_mon:02d}-{dt.tm_mday:02d}"
-            self.draw.text((5, y), f"RTC:  {rtc_time}", font=self.font_medium, fill=self.WHITE)
+            self.draw_field("RTC:  ", rtc_time, font=self.font_medium, fill=self.WHITE)
         else:
-            self.draw.text((5, y), "RTC:  --:--:--", font=self.font_medium, fill=self.GRAY)
-        y += 20
+            self.draw_field("RTC:  ", "--:--:--", font=self.font_medium, fill=self.GRAY)
 
         # RPi System Time
-        import time as systime
-        now = systime.localtime()
+        now = time.localtime()
         sys_time = f"{now.tm_hour:02d}:{now.tm_min:02d}:{now.tm_sec:02d}"
-        self.draw.text((5, y), f"RPi:  {sys_time}", font=self.font_medium, fill=self.CYAN)
-        y += 20
+        self.draw_text(self.value_xy["RPi:  "], sys_time, font=self.font_medium, fill=self.CYAN)
 
-        # Show drift if both available
+        # Show drift and date if RTC available
         if self.sensor_data['datetime']:
-            dt = self.sensor_data['datetime']
             rtc_secs = dt.tm_hour * 3600 + dt.tm_min * 60 + dt.tm_sec
             sys_secs = now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
             drift = sys_secs - rtc_secs
             if abs(drift) < 2:
-                self.draw.text((5, y), f"Drift: {drift:+d}s (synced)", font=self.font_small, fill=self.GREEN)
+                self.draw_field("Drift: ", f"{drift:+d}s (synced)", font=self.font_small, fill=self.GREEN)
             else:
-                self.draw.text((5, y), f"Drift: {drift:+d}s", font=self.font_small, fill=self.YELLOW)
-        y += 18
+                self.draw_field("Drift: ", f"{drift:+d}s", font=self.font_small, fill=self.YELLOW)
+            self.draw_field("Date: ", rtc_date, font=self.font_small, fill=self.GRAY)
 
-        # Date
-        if self.sensor_data['datetime']:
-            self.draw.text((5, y), f"Date: {rtc_date}", font=self.font_small, fill=self.GRAY)
-        y += 18
-
-        # Sensor status
-        sensors = [
-            ("RTC", self.rtc is not None),
-            ("AHT", self.aht is not None),
-            ("BMP", self.bmp is not None),
-            ("CO2", self.scd is not None and self.sensor_data['co2'] is not None),
-            ("GPS", self.gps is not None),
-        ]
+        # Sensor status, colored by supervisor state
+        sensors = [("RTC", 'rtc'), ("AHT", 'aht'), ("BMP", 'bmp'), ("CO2", 'scd'), ("GPS", 'gps')]
+        colors = {DEGRADED: self.YELLOW, RETRYING: self.ORANGE, QUARANTINED: self.RED}
+        health = self.supervisor.stats()
+        problem = None
 
-        self.draw.text((5, y), "Sensors: ", font=self.font_small, fill=self.GRAY)
+        y = 101
         x = 60
-        for name, ok in sensors:
-            color = self.GREEN if ok else self.RED
-            self.draw.text((x, y), name, font=self.font_small, fill=color)
+        for label, name in sensors:
+            state = health[name]['state']
+            color = colors.get(state, self.GREEN)
+            if name == 'scd' and color is self.GREEN and self.sensor_data['co2'] is None:
+                color = self.GRAY  # Open, first measurement not in yet
+            self.draw_text((x, y), label, font=self.font_small, fill=color)
+            if problem is None and state in colors:
+                problem = (label, health[name], color)
             x += 35
 
-        # Page indicator
-        self.draw.text((self.width - 25, self.height - 15), "4/4", font=self.font_small, fill=self.GRAY)
-
-    def update_display(self):
-        """Update the display with current page."""
-        if self.current_page == 0:
-            self.draw_page_environmental()
-        elif self.current_page == 1:
-            self.draw_page_air_quality()
-        elif self.current_page == 2:
-            self.draw_page_gps()
-        elif self.current_page == 3:
-            self.draw_page_system()
+        # Detail for the first device that is not healthy
+        if problem:
+            label, info, color = problem
+            if info['state'] == DEGRADED:
+                detail = f"{label}: {info['errors']} errors"
+            else:
+                detail = f"{label}: {info['state']}, retry {info['retry_in']:.0f}s"
+            self.draw_text((5, 118), detail, font=self.font_small, fill=color)
+
+    def draw_page_perf(self):
+        """Draw performance page (I2C, render, SPI, loop and memory stats)."""
+        self._paste_layer(4)
+        self._update_gauges()
+
+        # Mean I2C read time per device
+        reads = []
+        for name in self.acquisition.workers:
+            histogram = self.metrics.histogram('sensor_read_ms', sensor=name)
+            if histogram:
+                reads.append(f"{name.upper()} {histogram.mean:.1f}")
+        x, y = self.value_xy["I2C ms: "]
+        self.draw_text((x, y), "  ".join(reads[:3]) or "--", font=self.font_small, fill=self.WHITE)
+        errors = self.metrics.counter_total('sensor_errors_total')
+        self.draw_text((x, y + 14), "  ".join(reads[3:] + [f"err {errors}"]), font=self.font_small,
+                       fill=self.WHITE if errors == 0 else self.YELLOW)
+
+        render = self.metrics.merged('render_ms')
+        self.draw_text(self.value_xy["Render: "], f"{render.mean:.2f}ms avg, {render.max:.1f} max",
+                       font=self.font_small, fill=self.WHITE)
+
+        push = self.metrics.merged('spi_push_ms')
+        stats = self.pusher.stats()
+        total = stats['bytes_pushed'] + stats['bytes_saved']
+        saved = 100 * stats['bytes_saved'] / total if total else 0
+        self.draw_text(self.value_xy["SPI push: "], f"{push.mean:.1f}ms avg, {saved:.0f}% saved",
+                       font=self.font_small, fill=self.WHITE)
+
+        lag = self.metrics.merged('loop_lag_ms')
+        self.draw_text(self.value_xy["Loop lag: "], f"{lag.mean:.1f}ms avg, {lag.max:.1f} max",
+                       font=self.font_small, fill=self.WHITE)
+
+        wake = self.scheduler.stats()['wakeups_per_minute']
+        rss = process_rss_bytes() / 1e6
+        self.draw_text(self.value_xy["Wake: "], f"{wake:.0f}/min  RSS {rss:.1f}MB",
+                       font=self.font_small, fill=self.WHITE)
+
+    def _update_gauges(self):
+        """Refresh gauges sampled from other components."""
+        self.metrics.set('process_rss_bytes', process_rss_bytes())
+        for key, value in self.pusher.stats().items():
+            self.metrics.set(f'display_{key}', value)
+        for key, value in self.text_cache.stats().items():
+            self.metrics.set(f'text_cache_{key}', value)
+        self.metrics.set('loop_wakeups_per_minute', round(self.scheduler.stats()['wakeups_per_minute'], 2))
+        self.metrics.set('api_stream_clients', self.feed.clients)
+        self.metrics.set('api_snapshots', self.feed.version)
+        self.metrics.set('history_rows', len(self.history))
+        self.metrics.set('history_bytes', self.history.nbytes)
+        if self.gps_reader:
+            for key, value in self.gps_reader.stats().items():
+                self.metrics.set(f'gps_{key}', round(value, 3))
+        if self.logger:
+            for key, value in self.logger.stats().items():
+                self.metrics.set(f'datalog_{key}', round(value, 3))
+        if self.rollups:
+            for key, value in self.rollups.stats().items():
+                self.metrics.set(f'rollups_{key}', round(value, 3))
+
+    def _metrics_text(self):
+        """GET /metrics - Prometheus text format."""
+        self._update_gauges()
+        return 'text/plain; version=0.0.4', self.metrics.render_text().encode()
+
+    def _rtc_now(self):
+        """Last RTC reading advanced by the time elapsed since it was read."""
+        dt = self.sensor_data['datetime']
+        elapsed = time.monotonic() - self.sensor_times.get('datetime', time.monotonic())
+        return time.localtime(time.mktime(dt) + elapsed)
+
+    def replay(self, path):
+        """
+        Push a recorded trace through fusion, rendering and logging as fast as
+        possible, on the trace's own clock, and report the time spent in each.
+        The display is updated after every reading, skipping renders whose
+        inputs didn't change as it does live; pages rotate and samples are
+        taken at the usual intervals of trace time, so runs are repeatable.
+        """
+        clock = time.monotonic()
+        readings = 0
+        next_sample = next_page = None
+        start = time.perf_counter()
+        for offset, wall, values in read_trace(path):
+            if next_sample is None:
+                next_sample = offset + self.HISTORY_INTERVAL
+                next_page = offset + self.page_interval
+            self.publish(values, now=clock + offset)
+            while offset >= next_sample:
+                self._record_sample(wall - offset + next_sample, clock + next_sample)
+                next_sample += self.HISTORY_INTERVAL
+            if offset >= next_page:
+                self.current_page = (self.current_page + 1) % self.num_pages
+                next_page += self.page_interval
+            self.update_display()
+            readings += 1
+        flush_start = time.perf_counter()
+        if self.logger:
+            self.logger.flush()
+        elapsed = time.perf_counter() - start
+
+        publish = self.metrics.merged('publish_ms')
+        render = self.metrics.merged('render_ms')
+        push = self.metrics.merged('spi_push_ms')
+        print(f"Replayed {readings} readings in {elapsed:.2f}s ({readings / max(elapsed, 1e-9):.0f}/s)")
+        print(f"  Publish + fusion: {publish.mean:.3f}ms avg, {publish.max:.2f} max")
+        print(f"  Render:           {render.mean:.3f}ms avg, {render.max:.2f} max")
+        print(f"  SPI push:         {push.mean:.3f}ms avg, {push.max:.2f} max")
+        print(f"  Renders skipped:  {self.renders_skipped} (inputs unchanged)")
+        print(f"  Samples:          {len(self.history)}, log flush {(time.perf_counter() - flush_start) * 1000:.1f}ms")
+
+    def render_key(self):
+        """Everything the current frame depends on; equal keys mean an identical frame."""
+        page = self.current_page
+        versions = self.field_versions
+        key = (page, tuple(versions[field] for field in self.PAGE_FIELDS[page]))
+        if page in self.CLOCK_PAGES:
+            key += (int(time.time()), self.supervisor.version)
+        if page == self.ALERT_PAGE:
+            key += (self.alerts.version,)
+        if self.show_network:
+            key += ('network', self.network_version)
+        return key
+
+    def update_display(self, force=False):
+        """Update the display with current page, unless none of its inputs changed."""
+        start = time.perf_counter()
+        draw_page = self.pages[self.current_page]
+        key = self.render_key()
+        if key == self._render_key and not force:
+            self.renders_skipped += 1
+            self.metrics.inc('renders_skipped_total', page=draw_page.__name__[10:])
+            return
+        self._render_key = key
+        draw_page()
 
         # Draw network overlay on top if active
         if self.show_network:
             self.draw_network_overlay()
+        rendered = time.perf_counter()
+
+        # Push changed regions to display (skipped if frame is unchanged)
+        self.pusher.push()
+        pushed = time.perf_counter()
+
+        self.metrics.observe('render_ms', (rendered - start) * 1000, page=draw_page.__name__[10:])
+        self.metrics.observe('spi_push_ms', (pushed - rendered) * 1000)
+
+    def next_page(self):
+        """Advance to the next page and restart the rotation timer."""
+        self.show_page((self.current_page + 1) % self.num_pages)
 
-        # Push to display
-        self.display.image(self.image)
+    def show_page(self, page):
+        """Switch to a page (waking the screen if dark) and restart the rotation timer."""
+        if self.low_power:
+            self.set_backlight(True)
+        self.current_page = page
+        self.page_timer = self.scheduler.reschedule(self.page_timer, self.page_interval)
+        self.request_redraw()
+
+    def _rotate_page(self):
+        """Auto-rotate timer (paused while the network overlay is showing)."""
+        if not self.show_network:
+            self.next_page()
+
+    def _clock_tick(self):
+        """Once a second, on the second, so clocks on screen stay current."""
+        if self.current_page in self.CLOCK_PAGES or self.show_network:
+            self.request_redraw()
 
     def run(self):
         """Main loop."""
         print("\n" + "="*50)
         print("Sensor Station Running")
-        print("Button A: Toggle display | Button B: Network info")
+        print("Button A: Toggle display (hold: next page) | Button B: Network info")
         print("Pages auto-rotate every 15 seconds")
         print("="*50 + "\n")
 
-        last_sensor_read = 0
-        sensor_interval = 2.0  # Read sensors every 2 seconds
+        # Sensors are polled by their own workers from here on
+        self.acquisition.start()
+        self.network.start()
+        self.buttons.start()
+        if self.logger:
+            self.logger.start()
+        if self.rollups:
+            self.rollups.start()
+        if self.exporter:
+            self.exporter.start()
+        self.web.start()
+
+        self.page_timer = self.scheduler.every(self.page_interval, self._rotate_page)
+        self.clock_timer = self.scheduler.every(1.0, self._clock_tick, delay=1.0 - time.time() % 1.0)
+        self.scheduler.every(self.HISTORY_INTERVAL, self._record_sample)
 
         try:
             while True:
-                current_time = time.monotonic()
-
-                # Check buttons
-                self.check_buttons()
-
-                # Auto-rotate pages every 15 seconds (unless network overlay is showing)
-                if not self.show_network and current_time - self.last_page_change >= self.page_interval:
-                    self.current_page = (self.current_page + 1) % self.num_pages
-                    self.last_page_change = current_time
+                # Sleep until a button/data event or the next timer is due
+                self.check_buttons(timeout=self.scheduler.next_timeout())
+                self.scheduler.run_due()
 
-                # Read sensors periodically
-                if current_time - last_sensor_read >= sensor_interval:
-                    self.read_sensors()
-                    last_sensor_read = current_time
-
-                # Update display
-                self.update_display()
-
-                # Small delay to prevent CPU hogging
-                time.sleep(0.1)
+                if self.redraw_pending and not self.low_power:
+                    self.redraw_pending = False
+                    self.update_display()
 
         except KeyboardInterrupt:
             print("\nShutting down...")
+            self.acquisition.stop()
+            self.network.stop()
+            self.buttons.stop()
+            self.web.stop()
+            if self.logger:
+                self.logger.close()
+                print(f"Reading log: {self.logger.rows_written} rows in {self.logger.batches} batches")
+            if self.rollups:
+                self.rollups.close()
+                stats = self.rollups.stats()
+                print(f"Rollups: {stats['samples']} samples, {stats['buckets_closed']} buckets closed")
+            if self.recorder:
+                self.recorder.close()
+                print(f"Trace: {self.recorder.readings} readings recorded to {self.recorder.path}")
+            if self.exporter:
+                self.exporter.close()
+                stats = self.exporter.stats()
+                print(f"MQTT export: {stats['rows_sent']} rows in {stats['messages']} messages, "
+                      f"{stats['outbox']} batches queued offline")
+            stats = self.scheduler.stats()
+            print(f"Wakeups: {stats['wakeups_per_minute']:.1f}/min, "
+                  f"loop lag avg {stats['lag_avg_ms']:.1f}ms / max {stats['lag_max_ms']:.1f}ms")
+            if self.gps_reader:
+                stats = self.gps_reader.stats()
+                print(f"GPS: {stats['sentences_per_second']:.2f} sentences/s, "
+                      f"{stats['parse_errors']} parse errors, {stats['overruns']} overruns")
+            stats = self.pusher.stats()
+            print(f"Frames: {stats['frames']} ({stats['frames_skipped']} unchanged), "
+                  f"{self.renders_skipped} renders skipped, SPI bytes saved: {stats['bytes_saved']}")
+            stats = self.text_cache.stats()
+            print(f"Text cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['glyph_hits']} glyph hits")
             # Turn off backlight
             self.backlight.value = False
             # Stop SCD-41 measurements
             if self.scd:
                 self.scd.stop_periodic_measurement()
+            self.hw.close()
 
 
 def main():
     """Entry point."""
+    parser = argparse.ArgumentParser(description="Environmental sensor station")
+    parser.add_argument('--simulate', action='store_true', help="use simulated devices (no Pi needed)")
+    parser.add_argument('--png', help="with --simulate, save the screen to this PNG file")
+    parser.add_argument('--latency', type=float, default=1.0, help="scale simulated I2C delays (0 = none)")
+    parser.add_argument('--noise', type=float, default=1.0, help="scale simulated sensor noise")
+    parser.add_argument('--record', metavar='TRACE', help="record raw readings to a trace file")
+    parser.add_argument('--replay', metavar='TRACE', help="play a recorded trace instead of reading sensors")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="replay speed (1 = real time, 0 = as fast as possible)")
+    args = parser.parse_args()
+
     print("Initializing Sensor Station...")
-    station = SensorStation()
+    if args.simulate or args.replay:
+        # Keep simulated readings out of the real log
+        backend = SimBackend(latency=args.latency, noise=args.noise, png_path=args.png)
+        station = SensorStation(backend, log_path=SensorStation.SIM_LOG_PATH)
+    else:
+        station = SensorStation()
+
+    if args.record:
+        station.recorder = TraceWriter(args.record)
+    if args.replay and args.speed <= 0:
+        station.replay(args.replay)
+        if station.logger:
+            station.logger.close()
+        if station.rollups:
+            station.rollups.close()
+        station.hw.close()
+        return
+    if args.replay:
+        station.acquisition = TracePlayer(args.replay, station.publish, args.speed)
     station.run()
 
 
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Sensor Traces
+Record raw readings to a compact binary file and play them back
+
+Each reading (the dict a sensor worker publishes) is stored as its time
+offset plus one double per field. Field names and types are written once,
+the first time a combination of fields appears, so an AHT20 reading takes
+27 bytes. Paths ending in .gz are gzip-compressed.
+
+File layout (little-endian):
+- header:  b'SSTRACE1', start wall time (double)
+- schema:  kind 0, schema id (uint16), JSON length (uint16), JSON [[name, type]...]
+- reading: kind 1, schema id (uint16), offset seconds (double), values (doubles)
+
+Types: 'f' float, 'i' int, 'b' bool, 't' struct_time (stored as epoch).
+None is stored as NaN.
+"""
+
+import gzip
+import json
+import math
+import struct
+import threading
+import time
+
+MAGIC = b'SSTRACE1'
+SCHEMA = 0
+READING = 1
+
+_HEADER = struct.Struct('<d')
+_RECORD = struct.Struct('<BH')
+_LENGTH = struct.Struct('<H')
+_OFFSET = struct.Struct('<d')
+
+
+def _open(path, mode):
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+
+def _type(value):
+    if isinstance(value, bool):
+        return 'b'
+    if isinstance(value, int):
+        return 'i'
+    if isinstance(value, time.struct_time):
+        return 't'
+    if value is None or isinstance(value, float):
+        return 'f'
+    return None  # Not recordable (strings etc.)
+
+
+def _encode(value, kind):
+    if value is None:
+        return math.nan
+    if kind == 't':
+        return time.mktime(value)
+    return float(value)
+
+
+def _decode(value, kind):
+    if value != value:  # NaN
+        return None
+    if kind == 'b':
+        return bool(value)
+    if kind == 'i':
+        return int(value)
+    if kind == 't':
+        return time.localtime(value)
+    return value
+
+
+class TraceWriter:
+    """Appends readings to a trace file (safe to call from any thread)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = _open(path, 'wb')
+        self.started = time.monotonic()
+        self.file.write(MAGIC + _HEADER.pack(time.time()))
+        self._schemas = {}  # ((name, type), ...) -> (id, Struct)
+        self._lock = threading.Lock()
+        self.readings = 0
+
+    def write(self, values):
+        """Record one published reading."""
+        offset = time.monotonic() - self.started
+        fields = tuple((name, kind) for name, kind in ((n, _type(v)) for n, v in values.items()) if kind)
+        with self._lock:
+            schema = self._schemas.get(fields)
+            if schema is None:
+                schema = self._schemas[fields] = (len(self._schemas), struct.Struct(f'<{len(fields)}d'))
+                text = json.dumps(fields).encode()
+                self.file.write(_RECORD.pack(SCHEMA, schema[0]) + _LENGTH.pack(len(text)) + text)
+            packed = schema[1].pack(*(_encode(values[name], kind) for name, kind in fields))
+            self.file.write(_RECORD.pack(READING, schema[0]) + _OFFSET.pack(offset) + packed)
+            self.readings += 1
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+
+
+def read_trace(path):
+    """Yield (offset, wall_time, values) for each reading in a trace."""
+    with _open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a sensor trace")
+        start = _HEADER.unpack(f.read(_HEADER.size))[0]
+        schemas = {}
+        while True:
+            head = f.read(_RECORD.size)
+            if len(head) < _RECORD.size:
+                return  # End of file (or a reading cut off by a crash)
+            kind, schema_id = _RECORD.unpack(head)
+            if kind == SCHEMA:
+                length = _LENGTH.unpack(f.read(_LENGTH.size))[0]
+                fields = json.loads(f.read(length))
+                schemas[schema_id] = (fields, struct.Struct(f'<{len(fields)}d'))
+                continue
+            fields, layout = schemas[schema_id]
+            data = f.read(_OFFSET.size + layout.size)
+            if len(data) < _OFFSET.size + layout.size:
+                return
+            offset = _OFFSET.unpack_from(data)[0]
+            raw = layout.unpack_from(data, _OFFSET.size)
+            values = {name: _decode(value, kind) for (name, kind), value in zip(fields, raw)}
+            yield offset, start + offset, values
+
+
+class TracePlayer:
+    """
+    Publishes a trace's readings in real time (or speed times faster) from
+    a thread. Stands in for the AcquisitionEngine during a replay.
+    """
+
+    def __init__(self, path, publish, speed=1.0):
+        self.path = path
+        self.publish = publish
+        self.speed = speed
+        self.workers = {}  # No devices to report on
+        self.readings = 0
+        self.done = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="trace-player", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+
+    def _loop(self):
+        started = time.monotonic()
+        for offset, _, values in read_trace(self.path):
+            delay = started + offset / self.speed - time.monotonic()
+            if self._stop.wait(max(0.0, delay)):
+                return
+            self.publish(values)
+            self.readings += 1
+        self.done = True
+        print(f"✓ Replay finished ({self.readings} readings)")
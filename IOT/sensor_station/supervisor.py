@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Device Supervisor
+Per-device health tracking, re-initialization with backoff, quarantine
+
+Each device is in one of these states:
+- ok:          reading normally
+- degraded:    recent read errors, still being read
+- retrying:    dropped after too many errors in a row (or never opened);
+               re-opened after a backoff that doubles with every failure
+- quarantined: too many failed re-opens; only tried again rarely, so a
+               dead or unplugged device stops costing I2C timeouts
+
+Sensor workers ask the supervisor before touching the bus and report the
+outcome of every read. Nothing here runs on a thread of its own.
+"""
+
+import threading
+import time
+
+OK = 'ok'
+DEGRADED = 'degraded'
+RETRYING = 'retrying'
+QUARANTINED = 'quarantined'
+
+STATE_CODES = {OK: 0, DEGRADED: 1, RETRYING: 2, QUARANTINED: 3}  # For the metrics gauge
+
+
+class DeviceHealth:
+    """Health record of one device."""
+
+    def __init__(self, name, opener):
+        self.name = name
+        self.opener = opener
+        self.state = OK
+        self.consecutive_errors = 0
+        self.errors = 0
+        self.reinits = 0
+        self.failures = 0       # Drops and failed re-opens since the last good read
+        self.backoff = 0.0
+        self.next_retry = 0.0   # monotonic
+        self.last_error = None
+
+
+class Supervisor:
+    """Decides when a device may be read and when to re-open it."""
+
+    def __init__(self, on_change=None, metrics=None, max_errors=3, backoff=2.0, max_backoff=300.0,
+                 quarantine_after=6, quarantine_time=1800.0):
+        """
+        on_change(name, device) is called when a device is dropped (device
+        None) or re-opened. A device is dropped after max_errors failed reads
+        in a row, and quarantined after quarantine_after drops or failed
+        re-opens without a good read in between.
+        """
+        self.on_change = on_change
+        self.metrics = metrics
+        self.max_errors = max_errors
+        self.base_backoff = backoff
+        self.max_backoff = max_backoff
+        self.quarantine_after = quarantine_after
+        self.quarantine_time = quarantine_time
+        self.devices = {}
+        self.version = 0  # Bumped on every state or error count change
+        self._lock = threading.Lock()
+
+    def add(self, name, opener, opened=True, error=None):
+        """Track a device; opened=False schedules its first re-open."""
+        health = self.devices[name] = DeviceHealth(name, opener)
+        if not opened:
+            health.last_error = error
+            self._schedule_retry(health, time.monotonic())
+        self._update_gauge(health)
+
+    def state(self, name):
+        health = self.devices.get(name)
+        return health.state if health else None
+
+    def available(self, name):
+        """True if the device can be read now."""
+        return self.devices[name].state in (OK, DEGRADED)
+
+    def attempt(self, name):
+        """
+        Re-open the device if its retry time has come. Returns 0 if it is
+        now available, or seconds until it is worth asking again.
+        """
+        health = self.devices[name]
+        now = time.monotonic()
+        if now < health.next_retry:
+            return health.next_retry - now
+
+        health.reinits += 1
+        try:
+            device = health.opener()
+        except Exception as e:
+            health.last_error = str(e)
+            self._count_reinit(name, 'failed')
+            self._schedule_retry(health, now)
+            return health.next_retry - now
+
+        self._count_reinit(name, 'ok')
+        with self._lock:
+            health.state = OK
+            health.consecutive_errors = 0
+        self._update_gauge(health)
+        print(f"✓ {name} re-initialized")
+        if self.on_change:
+            self.on_change(name, device)
+        return 0
+
+    def read_ok(self, name):
+        health = self.devices[name]
+        if health.consecutive_errors or health.failures:
+            with self._lock:
+                health.consecutive_errors = 0
+                health.failures = 0
+                health.backoff = 0.0
+                health.state = OK
+            self._update_gauge(health)
+
+    def read_failed(self, name, error):
+        """Count a failed read; drop the device after max_errors in a row."""
+        health = self.devices[name]
+        with self._lock:
+            health.errors += 1
+            health.consecutive_errors += 1
+            health.last_error = str(error)
+            dropped = health.consecutive_errors >= self.max_errors
+            if dropped:
+                self._schedule_retry(health, time.monotonic())
+            else:
+                health.state = DEGRADED
+        self._update_gauge(health)
+        if dropped:
+            print(f"✗ {name} dropped after {health.consecutive_errors} errors: {error}")
+            if self.on_change:
+                self.on_change(name, None)
+
+    def _schedule_retry(self, health, now):
+        """Back off (doubling) or quarantine after a failure."""
+        health.failures += 1
+        if health.failures >= self.quarantine_after:
+            health.state = QUARANTINED
+            health.next_retry = now + self.quarantine_time
+        else:
+            health.state = RETRYING
+            health.backoff = min(self.max_backoff, health.backoff * 2 or self.base_backoff)
+            health.next_retry = now + health.backoff
+        self._update_gauge(health)
+
+    def _update_gauge(self, health):
+        self.version += 1
+        if self.metrics:
+            self.metrics.set('device_state', STATE_CODES[health.state], device=health.name)
+
+    def _count_reinit(self, name, result):
+        if self.metrics:
+            self.metrics.inc('device_reinit_total', device=name, result=result)
+
+    def stats(self):
+        """State, error counts and next retry (seconds from now) per device."""
+        now = time.monotonic()
+        return {
+            name: {
+                'state': h.state,
+                'errors': h.errors,
+                'reinits': h.reinits,
+                'retry_in': max(0.0, h.next_retry - now) if h.state in (RETRYING, QUARANTINED) else None,
+                'last_error': h.last_error,
+            }
+            for name, h in self.devices.items()
+        }
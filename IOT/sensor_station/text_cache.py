@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Text Run and Glyph Cache
+Avoids re-rasterizing the same strings through FreeType every frame
+
+Two levels:
+- A bounded LRU of rendered text runs keyed by (font, text, colour)
+- A per-font atlas of digit, punctuation and unit glyphs, so numeric
+  readings like "1003.2 hPa" are composed from cached glyph bitmaps
+  instead of being rendered (and evicting useful runs) every time
+"""
+
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+
+class TextCache:
+    """Draws text onto a PIL image from cached bitmaps."""
+
+    # Characters readings are built from: digits, punctuation and units
+    ATLAS_CHARS = set("0123456789 .,:+-/%°" "CFNSEWPafhmpst")
+
+    def __init__(self, max_runs=256):
+        self.max_runs = max_runs
+        self._runs = OrderedDict()   # (font, text, fill) -> (tile, offset)
+        self._atlas = {}             # font -> {char: (mask, offset, advance)}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.glyph_hits = 0
+        self.glyph_misses = 0
+
+    def draw(self, image, xy, text, font, fill):
+        """Equivalent of ImageDraw.text(xy, text, font=font, fill=fill)."""
+        key = (font, text, fill)
+        run = self._runs.get(key)
+        if run is not None:
+            self._runs.move_to_end(key)
+            self.hits += 1
+        elif self.ATLAS_CHARS.issuperset(text):
+            self._compose(image, xy, text, font, fill)
+            return
+        else:
+            self.misses += 1
+            run = self._render_run(text, font, fill)
+            self._runs[key] = run
+            if len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+                self.evictions += 1
+
+        tile, (dx, dy) = run
+        if tile is not None:
+            image.paste(tile, (xy[0] + dx, xy[1] + dy), tile)
+
+    def _render_run(self, text, font, fill):
+        """Rasterize a whole string into an RGBA tile once."""
+        left, top, right, bottom = font.getbbox(text)
+        if right <= left or bottom <= top:
+            return None, (0, 0)
+        # Fully transparent tile in the text colour, so alpha is the coverage
+        tile = Image.new("RGBA", (right - left, bottom - top), tuple(fill) + (0,))
+        ImageDraw.Draw(tile).text((-left, -top), text, font=font, fill=fill)
+        return tile, (left, top)
+
+    def _compose(self, image, xy, text, font, fill):
+        """Draw a numeric string glyph by glyph from the font's atlas."""
+        glyphs = self._atlas.setdefault(font, {})
+        x, y = xy
+        for ch in text:
+            glyph = glyphs.get(ch)
+            if glyph is None:
+                self.glyph_misses += 1
+                glyph = glyphs[ch] = self._render_glyph(ch, font)
+            else:
+                self.glyph_hits += 1
+            mask, (dx, dy), advance = glyph
+            if mask is not None:
+                left = round(x) + dx
+                top = y + dy
+                image.paste(fill, (left, top, left + mask.size[0], top + mask.size[1]), mask)
+            x += advance
+
+    def _render_glyph(self, ch, font):
+        """Rasterize one glyph as a coverage mask."""
+        advance = font.getlength(ch)
+        left, top, right, bottom = font.getbbox(ch)
+        if right <= left or bottom <= top:
+            return None, (0, 0), advance
+        mask = Image.new("L", (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), ch, font=font, fill=255)
+        return mask, (left, top), advance
+
+    def stats(self):
+        """Hit/miss counters for runs and atlas glyphs."""
+        return {
+            'runs': len(self._runs),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'glyph_hits': self.glyph_hits,
+            'glyph_misses': self.glyph_misses,
+        }
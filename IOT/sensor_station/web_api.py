@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Station Web Server
+Minimal asyncio HTTP server running on its own thread
+
+Handlers are plain functions registered per path that return
+(content_type, body_bytes). Routes registered with params=True get the
+query string as a dict, and a ValueError from them is answered with 400.
+The server only answers GET and closes each connection after the response -
+enough for curl, Prometheus and dashboards without pulling in a web
+framework.
+
+LiveFeed adds the live readings API:
+- GET /api/latest   latest snapshot as JSON
+- GET /api/stream   the same snapshots as Server-Sent Events
+
+Each snapshot is serialized once when the readings change, and those same
+bytes are handed to every client, so extra dashboards cost almost nothing.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import parse_qsl
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class WebServer:
+    """Tiny GET-only HTTP server on a background asyncio loop."""
+
+    def __init__(self, host='127.0.0.1', port=8080):
+        self.host = host
+        self.port = port
+        self.routes = {}
+        self.param_routes = set()
+        self.streams = {}
+        self.loop = None
+        self.requests = 0
+        self._thread = None
+
+    def route(self, path, handler, params=False):
+        """Serve handler() -> (content_type, body) at path; handler(params) if params."""
+        self.routes[path] = handler
+        if params:
+            self.param_routes.add(path)
+
+    def stream(self, path, handler):
+        """Serve a long-lived response: await handler(writer) owns the connection."""
+        self.streams[path] = handler
+
+    def start(self):
+        """Start serving on a daemon thread."""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="web", daemon=True)
+        self._thread.start()
+        ready.wait(2.0)
+
+    def stop(self):
+        """Stop the event loop and wait briefly for open streams to close."""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(1.0)
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            print(f"✓ Web server on http://{self.host}:{self.port}/")
+        except OSError as e:
+            print(f"✗ Web server failed: {e}")
+            return
+        finally:
+            ready.set()
+        self.loop.run_forever()
+
+        # Cancel connections still open (SSE clients) so they close cleanly
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+    async def _handle(self, reader, writer):
+        """Read one request, dispatch it, close."""
+        try:
+            request = await reader.readline()
+            # Skip headers up to the blank line
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request.decode('latin-1').split()
+            if len(parts) < 2:
+                return
+            method = parts[0]
+            path, _, query = parts[1].partition('?')
+            self.requests += 1
+
+            if method != 'GET':
+                await self._respond(writer, 405, 'text/plain', b'GET only\n')
+            elif path in self.streams:
+                await self.streams[path](writer)
+            elif path not in self.routes:
+                await self._respond(writer, 404, 'text/plain', b'Not found\n')
+            else:
+                try:
+                    if path in self.param_routes:
+                        content_type, body = self.routes[path](dict(parse_qsl(query)))
+                    else:
+                        content_type, body = self.routes[path]()
+                except ValueError as e:
+                    await self._respond(writer, 400, 'text/plain', f"{e}\n".encode())
+                except Exception as e:
+                    await self._respond(writer, 500, 'text/plain', f"{e}\n".encode())
+                else:
+                    await self._respond(writer, 200, content_type, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+class LiveFeed:
+    """Latest readings, pre-serialized once per update and shared by all clients."""
+
+    KEEPALIVE = 15.0  # Seconds between SSE comments on a quiet stream
+
+    def __init__(self, server):
+        self.server = server
+        self.version = 0
+        self.json = b'{}'
+        self.event = b''
+        self._clients = set()  # One single-slot asyncio.Queue per SSE client
+
+        server.route('/api/latest', self._latest)
+        server.stream('/api/stream', self._stream)
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def update(self, readings):
+        """Serialize a new snapshot and push it to streams (callers serialize calls)."""
+        self.version += 1
+        # NaN is not valid JSON; send null instead
+        readings = {k: None if v != v else v for k, v in readings.items()}
+        if isinstance(readings.get('datetime'), time.struct_time):
+            readings['datetime'] = time.strftime('%Y-%m-%dT%H:%M:%S', readings['datetime'])
+        snapshot = {'time': time.time(), 'version': self.version, 'readings': readings}
+        body = json.dumps(snapshot, separators=(',', ':'), default=str).encode()
+        self.json = body
+        self.event = b'id: %d\ndata: %s\n\n' % (self.version, body)
+        loop = self.server.loop
+        if loop and self._clients:
+            loop.call_soon_threadsafe(self._broadcast, self.event)
+
+    def _broadcast(self, event):
+        """On the server loop: hand the shared bytes to every client."""
+        for queue in self._clients:
+            # Slow clients only ever get the newest snapshot
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _latest(self):
+        """GET /api/latest"""
+        return 'application/json', self.json
+
+    async def _stream(self, writer):
+        """GET /api/stream - one SSE event per snapshot until the client leaves."""
+        queue = asyncio.Queue(maxsize=1)
+        self._clients.add(queue)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n\r\n" + self.event
+            )
+            await writer.drain()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.KEEPALIVE)
+                except asyncio.TimeoutError:
+                    event = b': keepalive\n\n'
+                writer.write(event)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client left, or the server is shutting down
+        finally:
+            self._clients.discard(queue)
+